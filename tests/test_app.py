@@ -0,0 +1,161 @@
+import unittest
+from unittest import mock
+
+from usolitaire.app import (
+    FocusPosition,
+    FocusRow,
+    NoMoreMovesScreen,
+    ReplayScreen,
+    SelectedCardPosition,
+    USolitaire,
+)
+from usolitaire.card import Card
+from usolitaire.game import Game, Move, MoveType
+from usolitaire.rules import VEGAS
+from usolitaire.textual_ui import ClickType, MoveDirection, TableauCardClicked
+
+
+class FocusPositionTest(unittest.TestCase):
+    def setUp(self):
+        self.game = Game(seed=3)
+
+    def test_moves_between_rows(self):
+        stock = FocusPosition(FocusRow.TOP, 0)
+        self.assertEqual(
+            stock.moved(MoveDirection.RIGHT, self.game), FocusPosition(FocusRow.TOP, 1)
+        )
+        self.assertEqual(stock.moved(MoveDirection.LEFT, self.game), stock)
+        self.assertEqual(
+            stock.moved(MoveDirection.DOWN, self.game), FocusPosition(FocusRow.BOTTOM, 0, 0)
+        )
+        top_card = FocusPosition(FocusRow.BOTTOM, 3, 3)
+        self.assertEqual(
+            top_card.moved(MoveDirection.UP, self.game), FocusPosition(FocusRow.TOP, 1)
+        )
+
+    def test_moves_along_the_tableau(self):
+        position = FocusPosition(FocusRow.BOTTOM, 0)
+        for i in range(1, 7):
+            position = position.moved(MoveDirection.RIGHT, self.game)
+            self.assertEqual(position, FocusPosition(FocusRow.BOTTOM, i, i))
+        self.assertEqual(position.moved(MoveDirection.RIGHT, self.game), position)
+
+    def test_moves_up_and_down_face_up_cards(self):
+        self.game.face_down_counts[3] = 1
+        position = FocusPosition(FocusRow.BOTTOM, 3, 3)
+        position = position.moved(MoveDirection.UP, self.game)
+        self.assertEqual(position, FocusPosition(FocusRow.BOTTOM, 3, 2))
+        position = position.moved(MoveDirection.UP, self.game).moved(MoveDirection.UP, self.game)
+        self.assertEqual(position, FocusPosition(FocusRow.TOP, 1))
+        position = FocusPosition(FocusRow.BOTTOM, 3, 1).moved(MoveDirection.DOWN, self.game)
+        self.assertEqual(position, FocusPosition(FocusRow.BOTTOM, 3, 2))
+
+    def test_normalized_points_to_an_existing_card(self):
+        self.assertEqual(
+            FocusPosition(FocusRow.BOTTOM, 2, 9).normalized(self.game),
+            FocusPosition(FocusRow.BOTTOM, 2, 2),
+        )
+        self.game.tableau[2].clear()
+        self.assertEqual(
+            FocusPosition(FocusRow.BOTTOM, 2, 2).normalized(self.game),
+            FocusPosition(FocusRow.BOTTOM, 2),
+        )
+
+
+class ReplayScreenTest(unittest.IsolatedAsyncioTestCase):
+    async def test_go_to_move(self):
+        app = USolitaire()
+        async with app.run_test() as pilot:
+            for _ in range(3):
+                app._play(Move(MoveType.DEAL))
+            await pilot.press("r")
+            screen = app.screen
+            self.assertIsInstance(screen, ReplayScreen)
+            self.assertEqual(screen.move_number, 3)
+            await pilot.press("g", "1", "enter")
+            self.assertEqual(screen.move_number, 1)
+            await pilot.press("g", "-", "enter")
+            self.assertEqual(screen.move_number, 1)
+
+
+class DeadEndTest(unittest.IsolatedAsyncioTestCase):
+    def set_position(self, game, tableau, face_down_counts, stock=(), waste=()):
+        game.tableau = [list(tableau)] + [[] for _ in range(6)]
+        game.face_down_counts = [face_down_counts] + [0] * 6
+        game.stock = list(stock)
+        game.waste = list(waste)
+        game.stock_cycle_cards = set(stock) | set(waste)
+        game.foundations = [[], [], [], []]
+
+    async def test_reveal_into_dead_end(self):
+        app = USolitaire()
+        async with app.run_test() as pilot:
+            two = Card("2", "spades")
+            self.set_position(app.game, [Card("A", "spades"), two], 2)
+            self.assertFalse(app.game.is_dead_end())
+            app.post_message(TableauCardClicked("tableau0", two, ClickType.SINGLE, 0, 1))
+            await pilot.pause()
+            self.assertIsInstance(app.screen, NoMoreMovesScreen)
+
+    async def test_last_deal_into_dead_end(self):
+        app = USolitaire(rules=VEGAS)
+        async with app.run_test() as pilot:
+            self.set_position(
+                app.game,
+                [Card("K", "hearts")],
+                0,
+                stock=[Card("9", "diamonds")],
+                waste=[Card("A", "hearts"), Card("5", "clubs")],
+            )
+            app.game.redeals_left = 0
+            self.assertFalse(app.game.is_dead_end())
+            app.action_deal_from_stock()
+            await pilot.pause()
+            self.assertIsInstance(app.screen, NoMoreMovesScreen)
+
+
+class LowBandwidthTest(unittest.IsolatedAsyncioTestCase):
+    def count_refreshes(self, widget):
+        refresh_contents = widget.refresh_contents
+        widget.refresh_count = 0
+
+        def counting_refresh_contents():
+            widget.refresh_count += 1
+            refresh_contents()
+
+        widget.refresh_contents = counting_refresh_contents
+
+    @mock.patch("usolitaire.app.LOW_BANDWIDTH_FPS", 2)
+    async def test_bursts_are_refreshed_once_per_frame(self):
+        app = USolitaire(low_bandwidth=True)
+        async with app.run_test() as pilot:
+            stock, waste = app.query_one("#stock"), app.query_one("#waste")
+            self.count_refreshes(stock)
+            self.count_refreshes(waste)
+            for _ in range(5):
+                app.action_deal_from_stock()
+            self.assertEqual((stock.refresh_count, waste.refresh_count), (0, 0))
+            await pilot.pause()
+            self.assertEqual((stock.refresh_count, waste.refresh_count), (1, 1))
+            self.assertEqual(waste.top_card, app.game.waste[-1])
+
+            # the next burst waits for the next frame, and so do the updates
+            # depending on the piles being up to date
+            for _ in range(3):
+                app.action_deal_from_stock()
+            app.selected_card = SelectedCardPosition(
+                app.game.waste[-1], "waste", len(app.game.waste) - 1
+            )
+            app.highlight_selected_cards()
+            app.current_focus = FocusPosition(FocusRow.TOP, 1)
+            app._update_focus()
+            await pilot.pause()
+            self.assertEqual((stock.refresh_count, waste.refresh_count), (1, 1))
+            self.assertFalse(waste.has_class("selected"))
+            self.assertIsNot(app.focused, waste)
+
+            await pilot.pause(0.6)
+            self.assertEqual((stock.refresh_count, waste.refresh_count), (2, 2))
+            self.assertEqual(waste.top_card, app.game.waste[-1])
+            self.assertTrue(waste.has_class("selected"))
+            self.assertIs(app.focused, waste)
@@ -0,0 +1,82 @@
+import os
+import random
+import tempfile
+import unittest
+
+from usolitaire.deal_index import DealIndex, build_deal_index
+
+
+class DealIndexTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmpdir.name, "deals.idx")
+        build_deal_index(cls.path, first_seed=10, count=6, max_nodes=2000, processes=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_lookup(self):
+        with DealIndex(self.path) as index:
+            self.assertEqual(len(index), 6)
+            self.assertIsNone(index.lookup(9))
+            self.assertIsNone(index.lookup(16))
+            infos = [index.lookup(seed) for seed in range(10, 16)]
+        self.assertEqual([info.seed for info in infos], list(range(10, 16)))
+        for info in infos:
+            self.assertEqual(bool(info.winnable), info.solution_length is not None)
+            self.assertLessEqual(info.nodes, 2000)
+
+    def test_choose_seed(self):
+        with DealIndex(self.path) as index:
+            self.assertGreater(index.winnable_count, 0)
+            for difficulty in (None, "hard"):
+                seed = index.choose_seed(difficulty, rng=random.Random(1))
+                self.assertTrue(index.lookup(seed).winnable)
+
+    def test_choose_seed_without_deals_of_the_difficulty(self):
+        path = os.path.join(self.tmpdir.name, "one-deal.idx")
+        # the solver wins the deal of seed 0 within 5000 nodes
+        build_deal_index(path, first_seed=0, count=1, max_nodes=5000, processes=1)
+        with DealIndex(path) as index:
+            self.assertEqual(index.winnable_count, 1)
+            self.assertEqual(index.choose_seed("hard"), 0)
+            with self.assertRaises(ValueError):
+                index.choose_seed("easy")
+
+        build_deal_index(path, first_seed=0, count=1, max_nodes=1, processes=1)
+        with DealIndex(path) as index:
+            self.assertEqual(index.winnable_count, 0)
+            with self.assertRaises(ValueError):
+                index.choose_seed()
+
+    def test_rejects_other_files(self):
+        path = os.path.join(self.tmpdir.name, "other.idx")
+        with open(path, "wb") as f:
+            f.write(b"not an index")
+        with self.assertRaises(ValueError):
+            DealIndex(path)
+
+    def test_reuses_cached_positions(self):
+        path = os.path.join(self.tmpdir.name, "cached.idx")
+        cache_path = os.path.join(self.tmpdir.name, "positions.cache")
+        runs = []
+        for processes in (2, 1):
+            build_deal_index(
+                path,
+                first_seed=10,
+                count=6,
+                max_nodes=2000,
+                processes=processes,
+                cache_path=cache_path,
+            )
+            with DealIndex(path) as index:
+                runs.append([index.lookup(seed) for seed in range(10, 16)])
+        first, second = runs
+        self.assertTrue(any(info.winnable for info in first))
+        self.assertEqual([info.winnable for info in first], [info.winnable for info in second])
+        for before, after in zip(first, second):
+            if before.winnable:
+                self.assertEqual(after.nodes, 1)
+                self.assertEqual(after.solution_length, before.solution_length)
@@ -1,6 +1,7 @@
+import pickle
 import unittest
 
-from usolitaire import game
+from usolitaire import game, rules
 
 
 class GameTest(unittest.TestCase):
@@ -12,10 +13,10 @@ class GameTest(unittest.TestCase):
         self.assertEqual([len(pile) for pile in self.game.foundations], [0, 0, 0, 0])
         self.assertEqual([len(pile) for pile in self.game.tableau], [1, 2, 3, 4, 5, 6, 7])
         self.assertEqual(len(self.game.stock), 24)
-        self.assertTrue(all(not c.face_up for c in self.game.stock))
-        for pile in self.game.tableau:
-            self.assertTrue(all(not c.face_up for c in pile[:-1]))
-            self.assertTrue(pile[-1].face_up)
+        self.assertEqual(self.game.face_down_counts, [0, 1, 2, 3, 4, 5, 6])
+        for i, pile in enumerate(self.game.tableau):
+            self.assertTrue(self.game.is_tableau_card_face_up(i, len(pile) - 1))
+            self.assertFalse(self.game.is_tableau_card_face_up(i, len(pile) - 2))
 
     def test_game_from_stock(self):
         prev_waste_len = len(self.game.waste)
@@ -23,3 +24,211 @@ class GameTest(unittest.TestCase):
         self.game.deal_from_stock()
         self.assertEqual(len(self.game.waste), prev_waste_len + 1)
         self.assertEqual(len(self.game.stock), prev_stock_len - 1)
+
+    def test_move_to_foundation_uses_suit_pile(self):
+        self.game.waste = [game.Card("A", "clubs")]
+        self.assertTrue(self.game.can_move_to_foundation_from_waste())
+        self.game.move_to_foundation_from_waste()
+        self.assertEqual([len(pile) for pile in self.game.foundations], [0, 0, 1, 0])
+
+        self.game.waste = [game.Card("3", "clubs")]
+        self.assertFalse(self.game.can_move_to_foundation_from_waste())
+        self.game.waste = [game.Card("2", "hearts")]
+        self.assertFalse(self.game.can_move_to_foundation_from_waste())
+        self.game.waste = [game.Card("2", "clubs")]
+        self.game.move_to_foundation_from_waste()
+        self.assertEqual([len(pile) for pile in self.game.foundations], [0, 0, 2, 0])
+
+    def test_won(self):
+        self.game._reset_game_to_almost_won_state()
+        self.assertFalse(self.game.won())
+        self.game.move_to_foundation_from_waste()
+        self.assertTrue(self.game.won())
+
+    def test_cards_are_interned(self):
+        self.assertIs(game.Card("Q", "hearts"), game.Card("Q", "hearts"))
+        self.assertIs(game.Deck()[0], game.Deck()[0])
+        with self.assertRaises(AttributeError):
+            game.Card("Q", "hearts").rank = "K"
+        with self.assertRaises(ValueError):
+            game.Card("1", "hearts")
+
+    def test_reveal_tableau_card(self):
+        pile = self.game.tableau[1]
+        self.game.tableau[0].extend(pile[1:])
+        del pile[1:]
+        self.assertFalse(self.game.can_move_to_foundation_from_tableau(1))
+        self.game.reveal_tableau_card(1)
+        self.assertEqual(self.game.face_down_counts[1], 0)
+        with self.assertRaises(game.InvalidMove):
+            self.game.reveal_tableau_card(1)
+
+    def test_seeded_deal_is_reproducible(self):
+        self.assertEqual(game.Game(seed=42).tableau, game.Game(seed=42).tableau)
+        self.assertNotEqual(game.Game(seed=42).stock, game.Game(seed=43).stock)
+
+    def test_from_position_key(self):
+        g = game.Game(seed=3, rules=rules.VEGAS)
+        for move in g.legal_moves()[:1] + [game.Move.parse("deal")]:
+            g.apply_move(move)
+        restored = game.Game.from_position_key(g.position_key(), rules.VEGAS)
+        self.assertEqual(restored.position_key(), g.position_key())
+        self.assertEqual(restored.stock_cycle_cards, g.stock_cycle_cards)
+        self.assertEqual(restored.legal_moves(), g.legal_moves())
+        with self.assertRaises(ValueError):
+            game.Game.from_position_key(g.position_key())
+
+    def test_position_key_depends_on_redeal_limit(self):
+        for unlimited, limited in [
+            (rules.KLONDIKE, rules.Rules(max_redeals=1)),
+            (rules.DRAW_THREE, rules.VEGAS),
+        ]:
+            g = game.Game(seed=5, rules=unlimited)
+            other = game.Game(seed=5, rules=limited)
+            other.redeals_left = g.redeals_left
+            self.assertNotEqual(g.position_key(), other.position_key())
+            self.assertNotEqual(g.canonical_key(), other.canonical_key())
+            with self.assertRaises(ValueError):
+                game.Game.from_position_key(g.position_key(), limited)
+            with self.assertRaises(ValueError):
+                game.Game.from_position_key(other.position_key(), unlimited)
+        with self.assertRaises(ValueError):
+            rules.Rules(max_redeals=255)
+
+    def test_canonical_key(self):
+        g = game.Game(seed=3)
+        g.apply_move(game.Move.parse("deal"))
+        swap = {"spades": "clubs", "clubs": "spades"}
+
+        def swapped(card):
+            return game.Card(card.rank, swap.get(card.suit, card.suit))
+
+        other = g.copy()
+        other.stock = [swapped(card) for card in g.stock]
+        other.waste = [swapped(card) for card in g.waste]
+        other.tableau = [[swapped(card) for card in pile] for pile in reversed(g.tableau)]
+        other.face_down_counts = g.face_down_counts[::-1]
+        self.assertNotEqual(other.position_key(), g.position_key())
+        self.assertEqual(other.canonical_key(), g.canonical_key())
+        restored = game.Game.from_position_key(g.canonical_key())
+        self.assertEqual(restored.canonical_key(), g.canonical_key())
+        self.assertEqual(len(restored.legal_moves()), len(g.legal_moves()))
+        g.apply_move(game.Move.parse("deal"))
+        self.assertNotEqual(other.canonical_key(), g.canonical_key())
+
+    def test_snapshot(self):
+        g = game.Game(seed=3, rules=rules.VEGAS)
+        snapshot = g.snapshot()
+        key = g.position_key()
+        g.apply_move(game.Move.parse("deal"))
+        self.assertEqual(snapshot.position_key(), key)
+        self.assertEqual(snapshot.waste, ())
+        with self.assertRaises(AttributeError):
+            snapshot.stock = ()
+        pickled = pickle.dumps(snapshot)
+        self.assertLess(len(pickled), 150)
+        self.assertEqual(pickle.loads(pickled), snapshot)
+        self.assertEqual(pickle.loads(pickled).tableau, snapshot.tableau)
+        self.assertEqual(snapshot.to_game().legal_moves(), game.Game(seed=3).legal_moves())
+
+    def test_restore_stock_requires_empty_stock(self):
+        with self.assertRaises(game.InvalidMove):
+            self.game.restore_stock()
+        while self.game.stock:
+            self.game.deal_from_stock()
+        self.game.restore_stock()
+        self.assertEqual(len(self.game.stock), 24)
+
+    def test_legal_moves_can_be_applied(self):
+        for seed in range(20):
+            g = game.Game(seed=seed)
+            for _ in range(200):
+                moves = g.legal_moves()
+                self.assertTrue(moves)
+                pile_moves = {
+                    (m.source, m.target)
+                    for m in moves
+                    if m.type == game.MoveType.TABLEAU_TO_TABLEAU
+                }
+                self.assertEqual(
+                    pile_moves,
+                    {(i, j) for i in range(7) for j in range(7) if g.can_move_tableau_pile(i, j)},
+                )
+                move = moves[seed % len(moves)]
+                self.assertEqual(game.Move.parse(str(move)), move)
+                g.apply_move(move)
+
+    def test_parse_invalid_move(self):
+        for text in ("deal 1", "tableau-tableau 1", "reveal 7", "fly 1"):
+            with self.assertRaises(ValueError):
+                game.Move.parse(text)
+
+    def _set_position(self, tableau, face_down_counts, stock=(), waste=()):
+        self.game.tableau = [list(pile) for pile in tableau] + [[] for _ in range(7 - len(tableau))]
+        self.game.face_down_counts = list(face_down_counts) + [0] * (7 - len(tableau))
+        self.game.stock = list(stock)
+        self.game.waste = list(waste)
+        self.game.stock_cycle_cards = set(stock) | set(waste)
+        self.game.foundations = [[], [], [], []]
+
+    def test_is_dead_end(self):
+        Card = game.Card
+        self._set_position([[Card("A", "spades"), Card("2", "spades")]], [1])
+        self.assertTrue(self.game.is_dead_end())
+
+        # an ace that can be dealt from the stock can go to the foundations
+        self._set_position([[Card("A", "spades"), Card("2", "spades")]], [1], [Card("A", "hearts")])
+        self.assertFalse(self.game.is_dead_end())
+
+        # moving a king from a pile to an empty one doesn't help...
+        self._set_position([[Card("K", "hearts")]], [0])
+        self.assertTrue(self.game.is_dead_end())
+        # ...unless it uncovers a card
+        self._set_position([[Card("A", "spades"), Card("K", "hearts")]], [1])
+        self.assertFalse(self.game.is_dead_end())
+
+        self.game._reset_game_to_almost_won_state()
+        self.assertFalse(self.game.is_dead_end())
+
+    def test_is_dead_end_without_redeals_left(self):
+        Card = game.Card
+        self.game = game.Game(rules=rules.VEGAS)
+        waste = [Card("A", "hearts"), Card("5", "clubs")]
+        self._set_position([[Card("A", "spades"), Card("2", "spades")]], [1], waste=waste)
+        self.game.redeals_left = 1
+        self.assertFalse(self.game.is_dead_end())
+        # the ace is stuck under the top card of the waste
+        self.game.redeals_left = 0
+        self.assertTrue(self.game.is_dead_end())
+
+        stuck = 0
+        for seed in range(30):
+            g = game.Game(seed=seed, rules=rules.VEGAS)
+            for _ in range(300):
+                moves = g.legal_moves()
+                if not moves:
+                    stuck += 1
+                    self.assertTrue(g.is_dead_end())
+                    break
+                g.apply_move(moves[seed % len(moves)])
+        self.assertGreater(stuck, 0)
+
+    def test_draw_three_with_limited_redeals(self):
+        g = game.Game(seed=1, rules=rules.VEGAS)
+        top_of_stock = g.stock[-3:]
+        g.deal_from_stock()
+        self.assertEqual(g.waste, top_of_stock[::-1])
+        self.assertEqual(len(g.stock), 21)
+        self.assertEqual(g.score(), -52)
+
+        for _ in range(2):
+            while g.stock:
+                g.deal_from_stock()
+            self.assertIn(game.Move(game.MoveType.RESTORE), g.legal_moves())
+            g.restore_stock()
+        while g.stock:
+            g.deal_from_stock()
+        self.assertFalse(g.can_restore_stock())
+        with self.assertRaises(game.InvalidMove):
+            g.restore_stock()
+        self.assertIsNone(self.game.score())
@@ -0,0 +1,43 @@
+import os
+import tempfile
+import unittest
+
+from usolitaire.game import Game
+from usolitaire.position_cache import SLOTS_PER_BUCKET, PositionCache, position_hash
+
+
+class PositionCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, "positions.cache")
+
+    def test_store_and_lookup(self):
+        game = Game(seed=1)
+        with PositionCache(self.path, buckets=16) as cache:
+            self.assertIsNone(cache.lookup(position_hash(game)))
+            cache.store(position_hash(game), True, 120)
+            cache.store(position_hash(Game(seed=2)), False)
+        with PositionCache(self.path, readonly=True) as cache:
+            self.assertEqual(cache.lookup(position_hash(game)), (True, 120))
+            self.assertEqual(cache.lookup(position_hash(Game(seed=2))), (False, 0))
+            self.assertEqual(len(cache), 2)
+            with self.assertRaises(ValueError):
+                cache.store(position_hash(game), False)
+
+    def test_full_bucket_evicts_oldest_generation(self):
+        # with a single bucket, every position goes to the same one
+        with PositionCache(self.path, buckets=1) as cache:
+            cache.store(1, True, 1)
+        with PositionCache(self.path, buckets=1) as cache:
+            for position in range(2, SLOTS_PER_BUCKET + 2):
+                cache.store(position, True, position)
+            self.assertIsNone(cache.lookup(1))
+            self.assertEqual(cache.lookup(SLOTS_PER_BUCKET + 1), (True, SLOTS_PER_BUCKET + 1))
+            self.assertEqual(len(cache), SLOTS_PER_BUCKET)
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            PositionCache(self.path)
@@ -0,0 +1,35 @@
+import unittest
+
+from textual.driver import Driver
+
+from usolitaire.profiling import OutputStats, counting_driver
+
+
+class _NullDriver(Driver):
+    def write(self, data: str) -> None:
+        pass
+
+    def start_application_mode(self):
+        pass
+
+    def disable_input(self):
+        pass
+
+    def stop_application_mode(self):
+        pass
+
+
+class OutputStatsTest(unittest.TestCase):
+    def test_counts_bytes_written_for_the_last_action(self):
+        stats = OutputStats()
+        driver_class = counting_driver(_NullDriver, stats)
+        self.assertTrue(issubclass(driver_class, _NullDriver))
+        driver = driver_class.__new__(driver_class)
+        driver.write("startup")
+        stats.start_action("deal")
+        driver.write("♠♠")
+        stats.start_action("deal")
+        driver.write("ab")
+        self.assertEqual(stats.bytes_written, {"startup": 7, "deal": 8})
+        self.assertEqual(stats.actions["deal"], 2)
+        self.assertIn("deal", stats.report().splitlines()[1])
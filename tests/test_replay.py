@@ -0,0 +1,50 @@
+import random
+import unittest
+
+from usolitaire.game import Game
+from usolitaire.replay import Replay, changed_piles
+
+
+def _random_game(seed: int, moves: int) -> tuple[Game, list]:
+    game = Game(seed=seed)
+    rng = random.Random(seed)
+    played = []
+    for _ in range(moves):
+        move = rng.choice(game.legal_moves())
+        game.apply_move(move)
+        played.append(move)
+    return game, played
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.final, self.moves = _random_game(7, 100)
+        self.replay = Replay(Game(seed=7), self.moves, keyframe_interval=8)
+
+    def test_keeps_a_keyframe_every_interval(self):
+        self.assertEqual(len(self.replay), 100)
+        self.assertEqual(len(self.replay.keyframes), 13)
+
+    def test_position_matches_the_played_game(self):
+        game = Game(seed=7)
+        for move_number, move in enumerate(self.moves):
+            self.assertEqual(self.replay.position(move_number).position_key(), game.position_key())
+            game.apply_move(move)
+        self.assertEqual(self.replay.position(100).position_key(), self.final.position_key())
+
+    def test_seek_leaves_the_given_game_unchanged(self):
+        game = self.replay.position(40)
+        key = game.position_key()
+        for target in (0, 39, 41, 47, 48, 100):
+            self.assertEqual(
+                self.replay.seek(game, 40, target).position_key(),
+                self.replay.position(target).position_key(),
+            )
+        self.assertEqual(game.position_key(), key)
+
+    def test_changed_piles(self):
+        game = Game(seed=7)
+        self.assertEqual(changed_piles(game, game.copy()), [])
+        after_deal = game.copy()
+        after_deal.deal_from_stock()
+        self.assertEqual(changed_piles(game, after_deal), ["stock", "waste"])
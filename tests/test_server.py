@@ -0,0 +1,69 @@
+import asyncio
+import json
+import unittest
+import unittest.mock
+
+from usolitaire.server import GameServer
+
+
+class GameServerTest(unittest.TestCase):
+    def setUp(self):
+        self.server = GameServer(idle_timeout=60, max_sessions=2)
+
+    def request(self, **request):
+        return json.loads(self.server.handle_request(json.dumps(request).encode()))
+
+    def test_play_session(self):
+        response = self.request(op="new", seed=42, moves=True)
+        self.assertTrue(response["ok"])
+        session = response["session"]
+        self.assertIn("deal", response["moves"])
+
+        response = self.request(op="move", session=session, move="deal")
+        self.assertEqual(response, {"ok": True, "won": False})
+        response = self.request(op="move", session=session, move="deal", dead_end=True)
+        self.assertEqual(response, {"ok": True, "won": False, "dead_end": False})
+        state = self.request(op="state", session=session)["state"]
+        self.assertEqual(state["stock"], 22)
+        self.assertEqual(len(state["waste"]), 2)
+        self.assertEqual([pile["face_down"] for pile in state["tableau"]], list(range(7)))
+
+        self.assertEqual(self.request(op="close", session=session), {"ok": True})
+        self.assertFalse(self.request(op="state", session=session)["ok"])
+
+    def test_errors(self):
+        session = self.request(op="new")["session"]
+        self.assertFalse(self.request(op="move", session=session, move="restore")["ok"])
+        self.assertFalse(self.request(op="move", session=session, move="reveal 9")["ok"])
+        self.assertFalse(self.request(op="fly")["ok"])
+        self.assertFalse(json.loads(self.server.handle_request(b"not json\n"))["ok"])
+        self.assertFalse(self.request(op=[])["ok"])
+        self.assertFalse(self.request(op="new", rules=["vegas"])["ok"])
+        deeply_nested = json.loads(self.server.handle_request(b"[" * 50_000 + b"\n"))
+        self.assertFalse(deeply_nested["ok"])
+
+    def test_request_too_long(self):
+        async def send_long_line():
+            reader = asyncio.StreamReader(limit=64)
+            reader.feed_data(b'{"op": "new", "seed": ' + b"1" * 100 + b"}\n")
+            reader.feed_eof()
+            writer = unittest.mock.Mock(drain=unittest.mock.AsyncMock())
+            await self.server.handle_client(reader, writer)
+            return writer
+
+        writer = asyncio.run(send_long_line())
+        (line,), _ = writer.write.call_args
+        self.assertFalse(json.loads(line)["ok"])
+        writer.close.assert_called_once()
+
+    def test_eviction(self):
+        first = self.request(op="new")["session"]
+        second = self.request(op="new")["session"]
+        self.request(op="state", session=first)
+        self.request(op="new")
+        self.assertIn(first, self.server.sessions)
+        self.assertNotIn(second, self.server.sessions)
+
+        last_used = max(session.last_used for session in self.server.sessions.values())
+        self.assertEqual(self.server.evict_idle_sessions(now=last_used + 61), 2)
+        self.assertFalse(self.server.sessions)
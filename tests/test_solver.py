@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+from usolitaire.game import Game
+from usolitaire.position_cache import PositionCache, position_hash
+from usolitaire.solver import solve
+
+
+class SolverTest(unittest.TestCase):
+    def test_solve_almost_won_game(self):
+        game = Game()
+        game._reset_game_to_almost_won_state()
+        result = solve(game)
+        self.assertTrue(result.winnable)
+        self.assertEqual(result.solution_length, 1)
+
+    def test_solution_wins_the_game(self):
+        game = Game(seed=0)
+        result = solve(game, max_nodes=5000)
+        self.assertTrue(result.winnable)
+        for move in result.solution:
+            game.apply_move(move)
+        self.assertTrue(game.won())
+
+    def test_solve_with_canonical_keys(self):
+        game = Game(seed=0)
+        result = solve(game, max_nodes=5000, canonical=True)
+        self.assertTrue(result.winnable)
+        for move in result.solution:
+            game.apply_move(move)
+        self.assertTrue(game.won())
+
+    def test_gives_up_after_max_nodes(self):
+        result = solve(Game(seed=0), max_nodes=10)
+        self.assertIsNone(result.winnable)
+        self.assertEqual(result.nodes, 10)
+
+    def test_reuses_cached_positions(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with PositionCache(os.path.join(tmpdir, "positions.cache"), buckets=1024) as cache:
+                first = solve(Game(seed=0), max_nodes=5000, cache=cache)
+                cache.store_all(first.proven)
+                self.assertEqual(
+                    cache.lookup(position_hash(Game(seed=0))), (True, first.solution_length)
+                )
+                second = solve(Game(seed=0), max_nodes=5000, cache=cache)
+        self.assertEqual(second.nodes, 1)
+        self.assertEqual(second.solution_length, first.solution_length)
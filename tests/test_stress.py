@@ -0,0 +1,40 @@
+import unittest
+from unittest import mock
+
+from usolitaire.game import Game, Move, MoveType
+from usolitaire.rules import VEGAS
+from usolitaire.stress import play, shrink
+
+
+def _reveal_without_checking(game, index):
+    game.face_down_counts[index] -= 1
+
+
+def _crash(game):
+    raise KeyError("oops")
+
+
+class StressTest(unittest.TestCase):
+    def test_random_games_keep_invariants(self):
+        for seed, rules in [(0, Game().rules), (1, VEGAS)]:
+            played, failure = play(seed, 1000, rules)
+            self.assertIsNone(failure)
+            self.assertEqual(len(played), 1000)
+
+    def test_finds_and_shrinks_failures(self):
+        with mock.patch.object(Game, "reveal_tableau_card", _reveal_without_checking):
+            _, failure = play(0, 1000, legal_ratio=0.5)
+            self.assertIsNotNone(failure)
+            shrunk = shrink(failure)
+        self.assertEqual(len(shrunk.moves), 1)
+        self.assertIs(shrunk.moves[0].type, MoveType.REVEAL)
+        self.assertIn("didn't raise InvalidMove", shrunk.message)
+        self.assertEqual(shrunk.moves, [Move.parse(str(shrunk.moves[0]))])
+
+    def test_reports_engine_crashes(self):
+        with mock.patch.object(Game, "restore_stock", _crash):
+            _, failure = play(0, 1000)
+            self.assertIsNotNone(failure)
+            shrunk = shrink(failure)
+        self.assertEqual(shrunk.moves, [Move(MoveType.RESTORE)])
+        self.assertEqual(shrunk.message, "KeyError: 'oops'")
@@ -0,0 +1,31 @@
+import unittest
+
+from usolitaire.policies import GreedyPolicy, RandomPolicy, load_policy
+from usolitaire.tournament import play_game, run_tournament, summarize
+
+
+class TournamentTest(unittest.TestCase):
+    def test_games_are_reproducible(self):
+        first = play_game("random", 5, max_moves=300)
+        second = play_game("random", 5, max_moves=300)
+        self.assertEqual((first.won, first.moves), (second.won, second.moves))
+        self.assertLessEqual(first.moves, 300)
+
+    def test_summarizes_each_policy(self):
+        results = run_tournament(["random", "greedy"], count=4, max_moves=300, processes=1)
+        self.assertEqual(
+            [(r.policy, r.seed) for r in results[:5]],
+            [("random", 0), ("random", 1), ("random", 2), ("random", 3), ("greedy", 0)],
+        )
+        stats = summarize(results)
+        self.assertEqual([s.policy for s in stats], ["random", "greedy"])
+        for policy_stats in stats:
+            self.assertEqual(policy_stats.games, 4)
+            self.assertLessEqual(policy_stats.win_rate.low, policy_stats.win_rate.mean)
+            self.assertLessEqual(policy_stats.win_rate.mean, policy_stats.win_rate.high)
+
+    def test_loads_policies(self):
+        self.assertIs(load_policy("greedy"), GreedyPolicy)
+        self.assertIs(load_policy("usolitaire.policies:RandomPolicy"), RandomPolicy)
+        with self.assertRaises(ValueError):
+            load_policy("nope")
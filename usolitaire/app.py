@@ -3,7 +3,9 @@ Console-based Klondike Solitaire game.
 """
 
 import argparse
+import asyncio
 import os
+import time
 from dataclasses import dataclass
 from enum import Enum
 
@@ -12,9 +14,16 @@ from textual.binding import Binding
 from textual.containers import Container, Grid
 from textual.css.query import NoMatches
 from textual.screen import ModalScreen, Screen
-from textual.widgets import Button, Footer, Header, Label, Markdown, Static
-
-from usolitaire.game import Card, Game
+from textual.widget import Widget
+from textual.widgets import Button, Footer, Header, Input, Label, Markdown, Static
+
+from usolitaire import server
+from usolitaire.card_render import CARD_SIZES, CardSize
+from usolitaire.deal_index import DIFFICULTIES, DealIndex
+from usolitaire.game import Card, Game, Move, MoveType
+from usolitaire.profiling import OutputStats, counting_driver
+from usolitaire.replay import Replay, changed_piles
+from usolitaire.rules import KLONDIKE, RULES, Rules
 from usolitaire.textual_ui import (
     CardClicked,
     ClickType,
@@ -24,6 +33,7 @@ from usolitaire.textual_ui import (
     PileWidget,
     TableauCardClicked,
     TableauPileWidget,
+    WastePileWidget,
 )
 
 
@@ -44,6 +54,45 @@ class FocusPosition:
         else:
             return f"tableau{self.pile_index}"
 
+    def normalized(self, game: Game) -> "FocusPosition":
+        """Return the position pointing to a card that exists in the given game"""
+        if self.row == FocusRow.TOP:
+            return self
+        pile_size = len(game.tableau[self.pile_index])
+        if not pile_size:
+            card_index = None
+        elif self.card_index is None or self.card_index >= pile_size:
+            card_index = pile_size - 1
+        else:
+            return self
+        return FocusPosition(self.row, self.pile_index, card_index)
+
+    def moved(self, direction: MoveDirection, game: Game) -> "FocusPosition":
+        """Return the position after moving in the given direction, without touching the UI"""
+        if self.row == FocusRow.TOP:
+            if self.pile_index == 0 and direction == MoveDirection.RIGHT:
+                return FocusPosition(FocusRow.TOP, 1)
+            if self.pile_index == 1 and direction == MoveDirection.LEFT:
+                return FocusPosition(FocusRow.TOP, 0)
+            if direction == MoveDirection.DOWN:
+                return FocusPosition(FocusRow.BOTTOM, self.pile_index).normalized(game)
+            return self
+
+        tableau_index, card_index = self.pile_index, self.card_index
+        if direction == MoveDirection.UP:
+            if card_index and game.is_tableau_card_face_up(tableau_index, card_index - 1):
+                return FocusPosition(FocusRow.BOTTOM, tableau_index, card_index - 1)
+            return FocusPosition(FocusRow.TOP, min(1, tableau_index))
+        if direction == MoveDirection.DOWN:
+            if card_index is not None and card_index < len(game.tableau[tableau_index]) - 1:
+                return FocusPosition(FocusRow.BOTTOM, tableau_index, card_index + 1)
+            return self
+        if direction == MoveDirection.LEFT and tableau_index > 0:
+            return FocusPosition(FocusRow.BOTTOM, tableau_index - 1).normalized(game)
+        if direction == MoveDirection.RIGHT and tableau_index < len(game.tableau) - 1:
+            return FocusPosition(FocusRow.BOTTOM, tableau_index + 1).normalized(game)
+        return self
+
 
 @dataclass
 class SelectedCardPosition:
@@ -97,13 +146,15 @@ class MyFooter(Static):
 
 
 class ConfirmNewGameScreen(ModalScreen):
-    BINDINGS = [("escape", "app.pop_screen", "Pop screen")]
+    BINDINGS = [("escape", "dismiss(False)", "Pop screen")]
+    MESSAGE = "❔    Do you want to start a new game?"
+    CANCEL_LABEL = "No, go back"
 
     def compose(self) -> ComposeResult:
         yield Grid(
-            Label("❔    Do you want to start a new game?"),
+            Label(self.MESSAGE),
             Button("Yes, start new game", variant="primary", id="confirm_new_game_btn"),
-            Button("No, go back", variant="default", id="cancel"),
+            Button(self.CANCEL_LABEL, variant="default", id="cancel"),
             id="dialog",
         )
 
@@ -117,20 +168,204 @@ class ConfirmNewGameScreen(ModalScreen):
         self.dismiss(event.button.id == "confirm_new_game_btn")
 
 
+class NoMoreMovesScreen(ConfirmNewGameScreen):
+    MESSAGE = "🤷    No more moves can help you win. Start a new game?"
+    CANCEL_LABEL = "No, keep looking"
+
+
+def pile_widgets(game: Game, card_size: CardSize, styled: bool = True) -> list[Widget]:
+    """Widgets showing the piles of a game, to be laid out in #game-container"""
+    widgets: list[Widget] = [PileWidget(game.stock, face_up=False, card_size=card_size, id="stock")]
+    if game.rules.draw_count > 1:
+        widgets.append(
+            WastePileWidget(
+                game.waste,
+                fan_size=game.rules.draw_count,
+                card_size=card_size,
+                styled=styled,
+                id="waste",
+            )
+        )
+    else:
+        widgets.append(PileWidget(game.waste, card_size=card_size, styled=styled, id="waste"))
+
+    # needed to occupy the space on the grid between waste and foundations:
+    widgets.append(Static(""))
+
+    for i, foundation_pile in enumerate(game.foundations):
+        widgets.append(
+            PileWidget(foundation_pile, card_size=card_size, styled=styled, id=f"foundation{i}")
+        )
+
+    for i, tableau_pile in enumerate(game.tableau):
+        widgets.append(
+            TableauPileWidget(
+                tableau_pile,
+                i,
+                game.face_down_counts[i],
+                card_size=card_size,
+                styled=styled,
+                id=f"tableau{i}",
+            )
+        )
+    return widgets
+
+
+def _show_pile(pile_widget: PileWidget | TableauPileWidget, game: Game):
+    """Point a pile widget to the pile of the same id in the given game, and refresh it"""
+    pile_id = pile_widget.id
+    if pile_id == "stock":
+        pile_widget.pile = game.stock
+    elif pile_id == "waste":
+        pile_widget.pile = game.waste
+    elif pile_id.startswith("foundation"):
+        pile_widget.pile = game.foundations[int(pile_id[10:])]
+    else:
+        index = int(pile_id[7:])
+        pile_widget.pile = game.tableau[index]
+        pile_widget.face_down_count = game.face_down_counts[index]
+    pile_widget.refresh_contents()
+
+
+class ReplayScreen(Screen):
+    """
+    Plays back a recorded game, move by move or jumping to any move.
+    Only the piles that differ between two moves are repainted.
+    """
+
+    # priority bindings, so that they work whatever card got focus by clicking
+    BINDINGS = [
+        Binding("left", "seek(-1)", "Previous move", priority=True),
+        Binding("right", "seek(1)", "Next move", priority=True),
+        Binding("pageup", "seek(-10)", "Back 10 moves", priority=True),
+        Binding("pagedown", "seek(10)", "Forward 10 moves", priority=True),
+        Binding("home", "seek_to(0)", "Start", show=False),
+        Binding("end", "seek_to(-1)", "End", show=False),
+        Binding("g", "go_to_move", "Go to move"),
+        Binding("escape", "app.pop_screen", "Back to game"),
+    ]
+
+    def __init__(
+        self, replay: Replay, card_size_name: str = "normal", styled: bool = True, **kwargs
+    ):
+        super().__init__(**kwargs)
+        self.replay = replay
+        self.card_size_name = card_size_name
+        self.styled = styled
+        self.move_number = len(replay)
+        self.game = replay.position(self.move_number)
+        self._pile_widgets: dict[str, PileWidget | TableauPileWidget] = {}
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        yield Container(
+            *pile_widgets(self.game, CARD_SIZES[self.card_size_name], self.styled),
+            id="game-container",
+            classes=self.card_size_name,
+        )
+        yield Input(placeholder="Go to move number", type="integer", id="replay-move-input")
+        yield Static(id="replay-status")
+        yield Footer()
+
+    def on_mount(self):
+        self._pile_widgets = {
+            widget.id: widget
+            for widget in self.query_one("#game-container").children
+            if isinstance(widget, (PileWidget, TableauPileWidget))
+        }
+        self.refresh_status()
+
+    def refresh_status(self):
+        status = f"Move {self.move_number}/{len(self.replay)}"
+        if self.move_number:
+            status += f": {self.replay.moves[self.move_number - 1]}"
+        self.query_one("#replay-status", Static).update(status)
+
+    def show_move(self, move_number: int):
+        move_number = max(0, min(move_number, len(self.replay)))
+        if move_number == self.move_number:
+            return
+        game = self.replay.seek(self.game, self.move_number, move_number)
+        for pile_id in changed_piles(self.game, game):
+            _show_pile(self._pile_widgets[pile_id], game)
+        self.game, self.move_number = game, move_number
+        self.refresh_status()
+
+    def action_seek(self, moves: int):
+        self.show_move(self.move_number + moves)
+
+    def action_seek_to(self, move_number: int):
+        self.show_move(len(self.replay) if move_number < 0 else move_number)
+
+    def action_go_to_move(self):
+        move_input = self.query_one("#replay-move-input", Input)
+        move_input.add_class("visible")
+        move_input.focus()
+
+    def on_input_submitted(self, event: Input.Submitted):
+        try:
+            self.show_move(int(event.value))
+        except ValueError:
+            pass  # integer inputs let through partial numbers like "-"
+        event.input.value = ""
+        event.input.remove_class("visible")
+        self.set_focus(None)
+
+    # the board can't be played, don't let the game handle clicks and keys on it
+
+    def on_card_clicked(self, event: CardClicked):
+        event.stop()
+
+    def on_tableau_card_clicked(self, event: TableauCardClicked):
+        event.stop()
+
+    def on_empty_tableau_clicked(self, event: EmptyTableauClicked):
+        event.stop()
+
+    def on_move_focus(self, event: MoveFocus):
+        event.stop()
+
+
+# how many times per second the piles are repainted at most in low bandwidth mode
+LOW_BANDWIDTH_FPS = 10
+
+
 class USolitaire(App):
     BINDINGS = [
         Binding("tab", "switch_row_focus", "Switch focus", priority=True, show=True),
         Binding("shift-tab", "switch_row_focus", "Switch focus", priority=True, show=False),
         Binding("ctrl+d", "deal_from_stock", "Deal from stock", show=True),
         Binding("n", "request_new_game", "New game", show=True),
+        Binding("r", "replay", "Replay", show=True),
         Binding("d", "toggle_dark", "Toggle 🌙 mode", show=True),
         ("q", "quit", "Quit"),
     ]
+    # actions playing the game, not available while watching a replay
+    GAME_ACTIONS = {"switch_row_focus", "deal_from_stock", "request_new_game", "replay"}
     CSS_PATH = os.path.join(os.path.dirname(__file__), "textual_app.css")
 
-    def __init__(self):
+    def __init__(
+        self,
+        card_size: str = "normal",
+        deal_index: DealIndex | None = None,
+        difficulty: str | None = None,
+        rules: Rules = KLONDIKE,
+        low_bandwidth: bool = False,
+        profile: bool = False,
+    ):
+        # needed by get_driver_class, called by App.__init__
+        self.output_stats = OutputStats() if profile else None
         super().__init__()
-        self.game = Game()
+        self.rules = rules
+        self.low_bandwidth = low_bandwidth
+        self.deal_index = deal_index
+        self.difficulty = difficulty
+        self.game = self._new_game()
+        # to replay the game
+        self.initial_game = self.game.copy()
+        self.history: list[Move] = []
+        self.card_size_name = card_size
+        self.card_size = CARD_SIZES[card_size]
 
         self.last_focus = {
             FocusRow.TOP: FocusPosition(FocusRow.TOP, 0),
@@ -139,6 +374,76 @@ class USolitaire(App):
         self._current_focus = FocusPosition(FocusRow.TOP, 0)
         self.selected_card: SelectedCardPosition | None = None
         self.playing: bool = True
+        self.dead_end_notified: bool = False
+        self._pending_refresh: dict[PileWidget | TableauPileWidget, None] = {}
+        self._after_refresh: dict = {}
+        self._refresh_scheduled = False
+        self._last_refresh = 0.0
+        self._focus_update_scheduled = False
+        self._pile_widgets: dict[str, PileWidget | TableauPileWidget] = {}
+        self.refresh_score()
+
+    def on_mount(self):
+        # the pile widgets are never replaced, so they're looked up only once
+        self._pile_widgets = {
+            widget.id: widget
+            for widget in self.query_one("#game-container").children
+            if isinstance(widget, (PileWidget, TableauPileWidget))
+        }
+
+    def get_driver_class(self):
+        driver_class = super().get_driver_class()
+        if self.output_stats is None:
+            return driver_class
+        return counting_driver(driver_class, self.output_stats)
+
+    def _start_action(self, action: str):
+        if self.output_stats is not None:
+            self.output_stats.start_action(action)
+
+    def _refresh_piles(self, *pile_widgets: PileWidget | TableauPileWidget):
+        """
+        Refresh the contents of the given pile widgets.
+
+        In low bandwidth mode, the refresh is delayed to repaint at most
+        LOW_BANDWIDTH_FPS times per second, so that the intermediate states
+        of quick bursts of moves are never sent to the terminal.
+        """
+        if not self.low_bandwidth:
+            for pile_widget in pile_widgets:
+                pile_widget.refresh_contents()
+            return
+        self._pending_refresh.update(dict.fromkeys(pile_widgets))
+        if self._refresh_scheduled:
+            return
+        self._refresh_scheduled = True
+        delay = self._last_refresh + 1 / LOW_BANDWIDTH_FPS - time.monotonic()
+        if delay > 0:
+            self.set_timer(delay, self._flush_refreshes)
+        else:
+            # still waits for the end of the current action
+            self.call_later(self._flush_refreshes)
+
+    def _delay_until_refreshed(self, callback) -> bool:
+        """
+        Call back after the pending refreshes if there are any, for updates
+        that depend on the pile widgets being up to date.
+        """
+        if not self._refresh_scheduled:
+            return False
+        self._after_refresh[callback] = None
+        return True
+
+    def _flush_refreshes(self):
+        self._refresh_scheduled = False
+        self._last_refresh = time.monotonic()
+        pending, self._pending_refresh = self._pending_refresh, {}
+        callbacks, self._after_refresh = self._after_refresh, {}
+        with self.batch_update():
+            for pile_widget in pending:
+                pile_widget.refresh_contents()
+        for callback in callbacks:
+            callback()
 
     @property
     def current_focus(self) -> FocusPosition:
@@ -149,12 +454,45 @@ class USolitaire(App):
         self._current_focus = value
         self.last_focus[value.row] = value
 
+    def _new_game(self) -> Game:
+        if self.deal_index is None:
+            return Game(rules=self.rules)
+        return Game(seed=self.deal_index.choose_seed(self.difficulty), rules=self.rules)
+
+    def _play(self, move: Move):
+        """Play a move on the game, recording it for the replay"""
+        self.game.apply_move(move)
+        self.history.append(move)
+
+    def check_action(self, action: str, parameters: tuple) -> bool | None:
+        if action in self.GAME_ACTIONS and isinstance(self.screen, ReplayScreen):
+            return False
+        return True
+
+    def action_replay(self):
+        self.push_screen(
+            ReplayScreen(
+                Replay(self.initial_game, self.history),
+                self.card_size_name,
+                styled=not self.low_bandwidth,
+            )
+        )
+
     def action_request_new_game(self):
+        self._request_new_game(ConfirmNewGameScreen())
+
+    def _request_new_game(self, screen: ConfirmNewGameScreen):
+        was_playing = self.playing
         self.playing = False
 
         def confirm_new_game(confirm):
-            if confirm:
-                self.game = Game()
+            if not confirm:
+                self.playing = was_playing
+            else:
+                self._start_action("new game")
+                self.game = self._new_game()
+                self.initial_game = self.game.copy()
+                self.history = []
                 try:
                     self.query_one("EndOfGameScreen")
                     self.pop_screen()
@@ -165,47 +503,43 @@ class USolitaire(App):
                 self.selected_card = None
                 self.refresh_contents()
                 self.playing = True
+                self.dead_end_notified = False
 
-        self.push_screen(ConfirmNewGameScreen(), callback=confirm_new_game)
+        self.push_screen(screen, callback=confirm_new_game)
 
     def compose(self) -> ComposeResult:
         yield Header()
-
-        with Container(id="game-container"):
-            yield PileWidget(self.game.stock, id="stock")
-            yield PileWidget(self.game.waste, id="waste")
-
-            # needed to occupy the space on the grid between waste and foundations:
-            yield Static("")
-
-            for i, foundation_pile in enumerate(self.game.foundations):
-                yield PileWidget(foundation_pile, id=f"foundation{i}")
-
-            for i, tableau_pile in enumerate(self.game.tableau):
-                yield TableauPileWidget(tableau_pile, i, id=f"tableau{i}")
-
+        yield Container(
+            *pile_widgets(self.game, self.card_size, styled=not self.low_bandwidth),
+            id="game-container",
+            classes=self.card_size_name,
+        )
         yield MyFooter()
         yield Footer()
 
     def refresh_contents(self):
+        pile_widgets = []
         for i, pile in enumerate(self.game.foundations):
             pile_widget = self._get_foundation_pile(i)
             pile_widget.pile = pile
-            pile_widget.refresh_contents()
+            pile_widgets.append(pile_widget)
 
         for i, pile in enumerate(self.game.tableau):
             pile_widget = self._get_tableau_pile(i)
             pile_widget.pile = pile
             pile_widget.index = i
-            pile_widget.refresh_contents()
+            pile_widget.face_down_count = self.game.face_down_counts[i]
+            pile_widgets.append(pile_widget)
 
         stock_pile_widget = self._get_stock_pile()
         stock_pile_widget.pile = self.game.stock
-        stock_pile_widget.refresh_contents()
+        pile_widgets.append(stock_pile_widget)
 
         waste_pile_widget = self._get_waste_pile()
         waste_pile_widget.pile = self.game.waste
-        waste_pile_widget.refresh_contents()
+        pile_widgets.append(waste_pile_widget)
+        self._refresh_piles(*pile_widgets)
+        self.refresh_score()
         self._update_focus()
         self.refresh()
 
@@ -221,93 +555,96 @@ class USolitaire(App):
         except NoMatches:
             pass
 
+        self._start_action("switch row")
         if self.current_focus.row == FocusRow.TOP:
             self.current_focus = self.last_focus[FocusRow.BOTTOM]
         else:
             self.current_focus = self.last_focus[FocusRow.TOP]
-        self._update_focus()
+        self._schedule_focus_update()
+
+    def _focus_position_of(self, event: MoveFocus) -> FocusPosition | None:
+        """Position of the widget that sent the event, None for the foundations"""
+        if event.sender_id == "stock":
+            return FocusPosition(FocusRow.TOP, 0)
+        if event.sender_id == "waste":
+            return FocusPosition(FocusRow.TOP, 1)
+        if event.sender_id.startswith("tableau"):
+            tableau_index = int(event.sender_id[7:])
+            pile = self.game.tableau[tableau_index]
+            card_index = pile.index(event.card) if event.card in pile else None
+            return FocusPosition(FocusRow.BOTTOM, tableau_index, card_index)
+        return None
 
     def on_move_focus(self, event: MoveFocus):
-        print(f"MOVE_FOCUS: sender={event.sender_id} direction={event.direction} card={event.card}")
+        """
+        Move the focus on the in-memory focus model, applying it to the
+        widgets once per frame, so that the bursts of events sent by holding
+        an arrow key don't each wait for a focus change and a repaint.
+        """
         if not event.sender_id:
             return  # leave this case to be handled by the tableau pile widget
 
-        if event.sender_id == "stock":
-            if event.direction == MoveDirection.RIGHT:
-                self.current_focus = FocusPosition(FocusRow.TOP, 1)
-            elif event.direction == MoveDirection.DOWN:
-                self.current_focus = FocusPosition(FocusRow.BOTTOM, 0)
-        elif event.sender_id == "waste":
-            if event.direction == MoveDirection.LEFT:
-                self.current_focus = FocusPosition(FocusRow.TOP, 0)
-            elif event.direction == MoveDirection.DOWN:
-                self.current_focus = FocusPosition(FocusRow.BOTTOM, 1)
-        elif event.sender_id and event.sender_id.startswith("tableau"):
-            tableau_index = int(event.sender_id[7:])
-            if event.direction == MoveDirection.UP:
-                card_index = self.current_focus.card_index
-                if card_index and self.game.tableau[tableau_index][card_index - 1].face_up:
-                    self.current_focus.card_index -= 1
-                else:
-                    self.current_focus = FocusPosition(FocusRow.TOP, min(1, tableau_index))
-            elif event.direction == MoveDirection.DOWN:
-                if self.current_focus.card_index is None:
-                    self.current_focus = FocusPosition(FocusRow.BOTTOM, tableau_index)
-                elif self.current_focus.card_index < len(self.game.tableau[tableau_index]) - 1:
-                    self.current_focus.card_index += 1
-            elif event.direction == MoveDirection.LEFT:
-                if tableau_index == 0:
-                    return
-                self.current_focus = FocusPosition(FocusRow.BOTTOM, tableau_index - 1)
-            elif event.direction == MoveDirection.RIGHT:
-                if tableau_index == len(self.game.tableau) - 1:
-                    return
-                self.current_focus = FocusPosition(FocusRow.BOTTOM, tableau_index + 1)
+        self._start_action("move focus")
+        focus = self.current_focus.normalized(self.game)
+        if not self._focus_update_scheduled:
+            # the focus may have been moved with the mouse since the last update,
+            # but once an update is scheduled the sender is behind the focus model
+            sender_position = self._focus_position_of(event)
+            if sender_position is not None:
+                focus = sender_position.normalized(self.game)
+        self.current_focus = focus.moved(event.direction, self.game)
+        self._schedule_focus_update()
+
+    def _schedule_focus_update(self):
+        if not self._focus_update_scheduled:
+            self._focus_update_scheduled = True
+            self.call_after_refresh(self._apply_scheduled_focus_update)
+
+    def _apply_scheduled_focus_update(self):
+        self._focus_update_scheduled = False
         self._update_focus()
 
     def _update_focus(self):
-        if self.current_focus is None:
+        if self.current_focus is None or self._delay_until_refreshed(self._update_focus):
             return
-        focused_pile = self.query_one("#" + self.current_focus.get_pile_id())
-        focused_pile.focus()
-
-        if (
-            self.current_focus.row == FocusRow.BOTTOM
-            and self.game.tableau[self.current_focus.pile_index]
-        ):
-            if self.current_focus.card_index is None or self.current_focus.card_index >= len(
-                self.game.tableau[self.current_focus.pile_index]
-            ):
-                self.current_focus.card_index = (
-                    len(self.game.tableau[self.current_focus.pile_index]) - 1
-                )
-
-        if self.current_focus.card_index is not None:
+        self.current_focus = self.current_focus.normalized(self.game)
+        focused_pile = self._pile_widgets[self.current_focus.get_pile_id()]
+        if self.current_focus.card_index is None:
+            focused_pile.focus()
+        else:
             focused_pile.children[self.current_focus.card_index].focus()
 
     def action_deal_from_stock(self):
         if not self.playing:
             return
 
+        self._start_action("deal")
         if self.game.stock:
-            self.game.deal_from_stock()
-        else:
-            self.game.restore_stock()
-        self._get_stock_pile().refresh_contents()
-        self._get_waste_pile().refresh_contents()
+            self._play(Move(MoveType.DEAL))
+        elif self.game.can_restore_stock():
+            self._play(Move(MoveType.RESTORE))
+        self._refresh_piles(self._get_stock_pile(), self._get_waste_pile())
+        self.check_if_game_over()
 
     def refresh_foundations(self):
-        for i in range(4):
-            self._get_foundation_pile(i).refresh_contents()
+        self._refresh_piles(*(self._get_foundation_pile(i) for i in range(4)))
+        self.refresh_score()
+
+    def refresh_score(self):
+        score = self.game.score()
+        if score is not None:
+            self.sub_title = f"Score: {'-' if score < 0 else ''}${abs(score)}"
 
     def highlight_selected_cards(self):
+        if self._delay_until_refreshed(self.highlight_selected_cards):
+            return
         self.query(".selected").remove_class("selected")
         if self.selected_card is None:
             return
         if self.selected_card.pile_id == "waste":
             self._get_waste_pile().add_class("selected")
         else:
-            pile_widget = self.query_one("#" + self.selected_card.pile_id)
+            pile_widget = self._pile_widgets[self.selected_card.pile_id]
             for child in pile_widget.children[self.selected_card.card_index :]:
                 child.add_class("selected")
 
@@ -319,13 +656,15 @@ class USolitaire(App):
                 event.click_type == ClickType.DOUBLE
                 and self.game.can_move_to_foundation_from_waste()
             ):
-                self.game.move_to_foundation_from_waste()
-                self._get_waste_pile().refresh_contents()
+                self._start_action("waste-foundation")
+                self._play(Move(MoveType.WASTE_TO_FOUNDATION))
+                self._refresh_piles(self._get_waste_pile())
                 self.refresh_foundations()
-                self.check_if_won()
+                self.check_if_game_over()
             else:
                 if not self.game.waste:
                     return
+                self._start_action("select")
                 new_selected_card = SelectedCardPosition(
                     self.game.waste[-1], "waste", len(self.game.waste) - 1
                 )
@@ -336,49 +675,58 @@ class USolitaire(App):
                 self.highlight_selected_cards()
 
     def _get_waste_pile(self) -> PileWidget:
-        return self.query_one("#waste", PileWidget)
+        return self._pile_widgets["waste"]
 
     def _get_stock_pile(self) -> PileWidget:
-        return self.query_one("#stock", PileWidget)
+        return self._pile_widgets["stock"]
 
     def _get_foundation_pile(self, foundation_index: int) -> PileWidget:
-        return self.query_one(f"#foundation{foundation_index}", PileWidget)
+        return self._pile_widgets[f"foundation{foundation_index}"]
 
     def _get_tableau_pile(self, tableau_index: int) -> TableauPileWidget:
-        return self.query_one(f"#tableau{tableau_index}", TableauPileWidget)
+        return self._pile_widgets[f"tableau{tableau_index}"]
 
     def refresh_tableau(self, tableau_index: int):
-        self._get_tableau_pile(tableau_index).refresh_contents()
+        pile_widget = self._get_tableau_pile(tableau_index)
+        pile_widget.face_down_count = self.game.face_down_counts[tableau_index]
+        self._refresh_piles(pile_widget)
 
-    def check_if_won(self):
+    def check_if_game_over(self):
         if self.game.won():
             self.push_screen(EndOfGameScreen())
             self.playing = False
+        elif not self.dead_end_notified and self.game.is_dead_end():
+            self.dead_end_notified = True
+            self._request_new_game(NoMoreMovesScreen())
 
     def on_tableau_card_clicked(self, event: TableauCardClicked):
         if event.click_type == ClickType.DOUBLE:
             if self.game.can_move_to_foundation_from_tableau(event.pile_index):
-                self.game.move_to_foundation_from_tableau(event.pile_index)
+                self._start_action("tableau-foundation")
+                self._play(Move(MoveType.TABLEAU_TO_FOUNDATION, source=event.pile_index))
                 self.refresh_tableau(event.pile_index)
                 self.refresh_foundations()
                 self.selected_card = None
                 self.highlight_selected_cards()
                 self._update_focus()
-                self.check_if_won()
+                self.check_if_game_over()
         else:
-            if not event.card.face_up:
+            if not self.game.is_tableau_card_face_up(event.pile_index, event.card_index):
                 if not self.game.tableau[event.pile_index][-1] == event.card:
                     return
-                event.card.face_up = True
+                self._start_action("reveal")
+                self._play(Move(MoveType.REVEAL, source=event.pile_index))
                 self.current_focus = FocusPosition(FocusRow.BOTTOM, event.pile_index)
                 self.refresh_tableau(event.pile_index)
                 self._update_focus()
+                self.check_if_game_over()
                 return
 
             target_card = SelectedCardPosition(
                 event.card, f"tableau{event.pile_index}", event.card_index
             )
             if target_card == self.selected_card:
+                self._start_action("select")
                 self.selected_card = None
             else:
                 if self.selected_card:
@@ -386,23 +734,28 @@ class USolitaire(App):
                     self._try_moving_selected_card_to_tableau(target_pile_index)
                     self.selected_card = None
                 else:
+                    self._start_action("select")
                     self.selected_card = target_card
             self.highlight_selected_cards()
 
     def _try_moving_selected_card_to_tableau(self, tableau_index: int):
+        self._start_action("move to tableau")
         src_pile_id = self.selected_card.pile_id
         if src_pile_id == "waste":
             if self.game.can_move_from_waste_to_tableau(tableau_index):
-                self.game.move_from_waste_to_tableau(tableau_index)
-                self._get_waste_pile().refresh_contents()
+                self._play(Move(MoveType.WASTE_TO_TABLEAU, target=tableau_index))
+                self._refresh_piles(self._get_waste_pile())
         else:
             src_pile_index = int(self.selected_card.pile_id[7:])
             if self.game.can_move_card_to_tableau(self.selected_card.card, tableau_index):
-                self.game.move_tableau_pile(src_pile_index, tableau_index)
+                self._play(
+                    Move(MoveType.TABLEAU_TO_TABLEAU, source=src_pile_index, target=tableau_index)
+                )
                 self.refresh_tableau(src_pile_index)
         self.refresh_tableau(tableau_index)
         self.selected_card = None
         self.highlight_selected_cards()
+        self.check_if_game_over()
 
     def on_empty_tableau_clicked(self, event: EmptyTableauClicked):
         if self.selected_card is None:
@@ -411,12 +764,97 @@ class USolitaire(App):
 
 
 def main():
-    # TODO: add an argument to reduce size
     parser = argparse.ArgumentParser()
-    parser.parse_args()
-
-    app = USolitaire()
+    parser.add_argument(
+        "--size",
+        choices=list(CARD_SIZES),
+        default="normal",
+        help="size of the cards (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rules",
+        choices=list(RULES),
+        default="klondike",
+        help="rules variant: draw one card with unlimited redeals, draw three cards, "
+        "or draw three cards with two redeals and Vegas scoring (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--winnable-deals",
+        metavar="INDEX",
+        help="only deal winnable games, from an index built with usolitaire.deal_index "
+        "(klondike rules only)",
+    )
+    parser.add_argument(
+        "--difficulty",
+        choices=DIFFICULTIES,
+        help="difficulty of the winnable deals (default: any)",
+    )
+    parser.add_argument(
+        "--low-bandwidth",
+        action="store_true",
+        help="repaint less often and without colors, for slow connections",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="report the bytes written to the terminal per action when exiting",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser(
+        "serve", help="host games for other programs, see usolitaire.server"
+    )
+    serve_parser.add_argument("--socket", help="listen on this Unix socket path")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=server.DEFAULT_PORT)
+    serve_parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=server.DEFAULT_IDLE_TIMEOUT,
+        help="seconds before an unused game is discarded (default: %(default)s)",
+    )
+    serve_parser.add_argument(
+        "--max-sessions",
+        type=int,
+        default=server.DEFAULT_MAX_SESSIONS,
+        help="maximum number of games kept (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            asyncio.run(
+                server.serve(
+                    args.socket, args.host, args.port, args.idle_timeout, args.max_sessions
+                )
+            )
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.difficulty and not args.winnable_deals:
+        parser.error("--difficulty requires --winnable-deals")
+    if args.winnable_deals and args.rules != "klondike":
+        # the deals are solved drawing one card at a time with unlimited redeals
+        parser.error("--winnable-deals requires --rules klondike")
+    deal_index = None
+    if args.winnable_deals:
+        try:
+            deal_index = DealIndex(args.winnable_deals)
+            deal_index.choose_seed(args.difficulty)
+        except (OSError, ValueError) as e:
+            parser.error("--winnable-deals: %s" % e)
+
+    app = USolitaire(
+        card_size=args.size,
+        deal_index=deal_index,
+        difficulty=args.difficulty,
+        rules=RULES[args.rules],
+        low_bandwidth=args.low_bandwidth,
+        profile=args.profile,
+    )
     app.run()
+    if app.output_stats is not None:
+        print(app.output_stats.report())
 
 
 if __name__ == "__main__":
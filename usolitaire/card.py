@@ -11,15 +11,56 @@ SUIT_SYMBOLS = {
 Rank = Literal["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
 Suit = Literal["spades", "diamonds", "clubs", "hearts"]
 
+RANKS: list[Rank] = ["A"] + [str(n) for n in range(2, 11)] + list("JQK")  # type: ignore
+SUITS: list[Suit] = ["spades", "diamonds", "clubs", "hearts"]
+
+_INTERNED: dict[tuple[str, str], "Card"] = {}
+
 
 class Card(object):
-    def __init__(self, rank: Rank, suit: Suit, face_up: bool = False):
-        self.rank: Rank = rank
-        self.suit: Suit = suit
-        self.face_up = face_up
+    """
+    An immutable playing card.
+
+    There is exactly one instance per rank and suit, so cards can be shared
+    between games and compared by identity. Whether a card is facing up or
+    down depends on where it is, and is tracked by the game holding it.
+    """
+
+    __slots__ = ("rank", "suit")
+
+    rank: Rank
+    suit: Suit
+
+    def __new__(cls, rank: Rank, suit: Suit):
+        try:
+            return _INTERNED[rank, suit]
+        except KeyError:
+            pass
+        if rank not in RANKS or suit not in SUITS:
+            raise ValueError("Invalid card: %r of %r" % (rank, suit))
+        card = super().__new__(cls)
+        object.__setattr__(card, "rank", rank)
+        object.__setattr__(card, "suit", suit)
+        _INTERNED[rank, suit] = card
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Card objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Card objects are immutable")
+
+    def __reduce__(self):
+        return (Card, (self.rank, self.suit))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self):
-        return "Card(rank={0.rank!r}, suit={0.suit!r}, face_up={0.face_up!r})".format(self)
+        return "Card(rank={0.rank!r}, suit={0.suit!r})".format(self)
 
     @property
     def suit_symbol(self):
@@ -28,3 +69,7 @@ class Card(object):
     @property
     def color(self):
         return "red" if self.suit in ("diamonds", "hearts") else "black"
+
+
+ALL_CARDS: tuple[Card, ...] = tuple(Card(rank, suit) for suit in SUITS for rank in RANKS)
+CARD_INDEX: dict[Card, int] = {card: index for index, card in enumerate(ALL_CARDS)}
@@ -1,21 +1,40 @@
+import functools
+from dataclasses import dataclass
+
+from textual.content import Content
+
 from usolitaire.game import Card
 
-ROWS, COLUMNS = 8, 10
+
+@dataclass(frozen=True)
+class CardSize:
+    """Dimensions of a drawn card, borders included"""
+
+    rows: int
+    columns: int
 
 
-def draw_empty_card():
-    rows, columns = ROWS, COLUMNS
+CARD_SIZES = {
+    "compact": CardSize(4, 8),
+    "normal": CardSize(8, 10),
+    "large": CardSize(10, 12),
+}
+DEFAULT_CARD_SIZE = CARD_SIZES["normal"]
+
+
+def draw_empty_card(size: CardSize = DEFAULT_CARD_SIZE):
     """
     Draws an empty card.
 
     Used for drawing empty piles (e.g. the foundation piles).
     """
+    rows, columns = size.rows, size.columns
     filling = (rows - 2) * (" " * (columns - 2) + "\n")
-    return add_card_borders(filling)
+    return add_card_borders(filling, size=size)
 
 
-def draw_faced_down_card_content(only_top=False):
-    rows, columns = ROWS, COLUMNS
+def draw_faced_down_card_content(only_top=False, size: CardSize = DEFAULT_CARD_SIZE):
+    rows, columns = size.rows, size.columns
 
     filling_line = (columns - 2) * "╬" + "\n"
 
@@ -25,8 +44,8 @@ def draw_faced_down_card_content(only_top=False):
     return filling_line * (rows - 2)
 
 
-def draw_faced_up_card_content(card, only_top=False):
-    rows, columns = ROWS, COLUMNS
+def draw_faced_up_card_content(card, only_top=False, size: CardSize = DEFAULT_CARD_SIZE):
+    rows, columns = size.rows, size.columns
 
     spaces = (columns - 6) * " "
     content = "{}{}{} \n".format(card.rank.ljust(2), spaces, card.suit_symbol)
@@ -45,8 +64,8 @@ def _wrap_lines_with(text, wrap, wrap_right=None):
     return "\n".join(f"{wrap}{L}{wrap_right}" for L in text.splitlines())
 
 
-def add_card_borders(text, only_top=False):
-    columns = COLUMNS
+def add_card_borders(text, only_top=False, size: CardSize = DEFAULT_CARD_SIZE):
+    columns = size.columns
 
     top = "╭" + "─" * (columns - 2) + "╮\n"
     bottom = "╰" + "─" * (columns - 2) + "╯"
@@ -61,23 +80,88 @@ def add_card_borders(text, only_top=False):
 
 def draw_card(
     card: Card,
+    face_up=True,
     only_top=False,
     add_rich_markup=False,
+    size: CardSize = DEFAULT_CARD_SIZE,
 ):
     """
-    Draws a faced down card.
+    Draws a card, facing up or down.
 
     If only_top is True, only the top of the card is drawn, simulating a
     card covered by other cards.
     """
-    if card.face_up:
-        text = draw_faced_up_card_content(card, only_top=only_top)
+    if face_up:
+        text = draw_faced_up_card_content(card, only_top=only_top, size=size)
         if add_rich_markup:
             color = "red" if card.color == "red" else ""
             text = _wrap_lines_with(text, f"[bold {color}]", f"[/bold {color}]")
     else:
-        text = draw_faced_down_card_content(only_top=only_top)
+        text = draw_faced_down_card_content(only_top=only_top, size=size)
 
-    text = add_card_borders(text, only_top=only_top)
+    text = add_card_borders(text, only_top=only_top, size=size)
 
     return text
+
+
+@functools.cache
+def render_empty_card(size: CardSize = DEFAULT_CARD_SIZE) -> Content:
+    """
+    Renders an empty card as content that can be given directly to a widget.
+    """
+    return Content(draw_empty_card(size=size))
+
+
+@functools.cache
+def render_card(
+    card: Card,
+    face_up=True,
+    only_top=False,
+    size: CardSize = DEFAULT_CARD_SIZE,
+    styled=True,
+) -> Content:
+    """
+    Renders a card as pre-styled content that can be given directly to a widget.
+
+    This avoids the markup parsing done for the strings returned by
+    draw_card(..., add_rich_markup=True). Content is immutable, so the result
+    is cached per card variant and size, and shared by all the widgets showing it.
+
+    If styled is False, the card is plain text, which is cheaper to send to
+    the terminal.
+    """
+    text = draw_card(card, face_up=face_up, only_top=only_top, size=size)
+    if not face_up or not styled:
+        return Content(text)
+
+    style = "bold red" if card.color == "red" else "bold"
+    lines = text.split("\n")
+    last_content_line = len(lines) if only_top else len(lines) - 1
+    parts: list[str | tuple[str, str]] = []
+    for i, line in enumerate(lines):
+        if i:
+            parts.append("\n")
+        if 0 < i < last_content_line:
+            parts.extend((line[0], (line[1:-1], style), line[-1]))
+        else:
+            parts.append(line)
+    return Content.assemble(*parts)
+
+
+FAN_STRIP_WIDTH = 3
+
+
+@functools.lru_cache(maxsize=1024)
+def render_fan(cards: tuple[Card, ...], size: CardSize = DEFAULT_CARD_SIZE, styled=True) -> Content:
+    """
+    Renders face-up cards fanned from left to right, as shown for the waste
+    when dealing three cards at a time: only a strip of the left side of the
+    covered cards is visible, and the last card is drawn whole.
+    """
+    covered = [render_card(card, size=size, styled=styled).split("\n") for card in cards[:-1]]
+    top = render_card(cards[-1], size=size, styled=styled).split("\n")
+    lines = [
+        Content.assemble(*(card_lines[i][:FAN_STRIP_WIDTH] for card_lines in covered), line)
+        for i, line in enumerate(top)
+    ]
+    return Content("\n").join(lines)
@@ -0,0 +1,245 @@
+"""
+Index of which deals are winnable, and how hard they are.
+
+Deals are identified by the seed given to Game(seed=...). The index is
+generated offline by solving a range of seeds with the default rules,
+drawing one card at a time with unlimited redeals, and is then used to
+start games that are known to be winnable, without searching anything:
+
+    python -m usolitaire.deal_index deals.idx --count 10000
+
+Layout of the file, in native byte order:
+
+- a header: magic, first seed, number of seeds, number of winnable seeds
+  and the maximum nodes the solver was allowed per deal
+- one record per seed: status, solution length and nodes searched
+- the winnable seeds, sorted from the easiest to the hardest
+
+Deals are hard when the solver needs to search many positions to win them.
+
+Passing --cache reuses the positions solved by previous runs, and shares
+them between the worker processes: the workers read the cache, and the
+main process stores what they proved. Deals then need less searching,
+which also makes them look easier than they are.
+"""
+
+import argparse
+import mmap
+import multiprocessing
+import random
+import struct
+from dataclasses import dataclass
+
+from usolitaire.game import Game
+from usolitaire.position_cache import PositionCache
+from usolitaire.solver import DEFAULT_MAX_NODES, solve
+
+MAGIC = b"USOLDI1\0"
+DIFFICULTIES = ("easy", "medium", "hard")
+
+_HEADER = struct.Struct("=8sQQQQ")
+_RECORD = struct.Struct("=BxHI")
+_SEED = struct.Struct("=Q")
+
+_UNKNOWN, _WINNABLE, _UNWINNABLE = 0, 1, 2
+
+
+@dataclass(frozen=True)
+class DealInfo:
+    seed: int
+    # None when the solver gave up on the deal
+    winnable: bool | None
+    nodes: int
+    solution_length: int | None
+
+
+class DealIndex(object):
+    """
+    Memory-mapped index of winnable deals.
+
+    How to use:
+    >>> with DealIndex("deals.idx") as index:  # doctest: +SKIP
+    ...     game = Game(seed=index.choose_seed(difficulty="easy"))
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            self._mmap.close()
+            raise ValueError("Not a deal index file: %r" % path)
+        magic, self.first_seed, self.count, self.winnable_count, self.max_nodes = (
+            _HEADER.unpack_from(self._mmap)
+        )
+        self._winnable_offset = _HEADER.size + self.count * _RECORD.size
+        expected_size = self._winnable_offset + self.winnable_count * _SEED.size
+        if magic != MAGIC or len(self._mmap) != expected_size:
+            self._mmap.close()
+            raise ValueError("Not a deal index file: %r" % path)
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, seed: int) -> DealInfo | None:
+        """Return what is known about the deal of the given seed, if it's in the index"""
+        index = seed - self.first_seed
+        if not 0 <= index < self.count:
+            return None
+        status, solution_length, nodes = _RECORD.unpack_from(
+            self._mmap, _HEADER.size + index * _RECORD.size
+        )
+        if status == _WINNABLE:
+            return DealInfo(seed, True, nodes, solution_length)
+        return DealInfo(seed, None if status == _UNKNOWN else False, nodes, None)
+
+    def choose_seed(self, difficulty: str | None = None, rng: random.Random | None = None) -> int:
+        """
+        Pick the seed of a winnable deal at random, optionally among the
+        easiest, medium or hardest third of the winnable deals.
+        """
+        start, end = 0, self.winnable_count
+        if difficulty is not None:
+            level = DIFFICULTIES.index(difficulty)
+            start, end = (
+                end * level // len(DIFFICULTIES),
+                end * (level + 1) // len(DIFFICULTIES),
+            )
+        if start >= end:
+            raise ValueError("No winnable deals in the index for %r" % (difficulty or "any"))
+        position = (rng or random).randrange(start, end)
+        (seed,) = _SEED.unpack_from(self._mmap, self._winnable_offset + position * _SEED.size)
+        return seed
+
+
+# cache of solved positions of the worker, opened read-only
+_worker_cache: PositionCache | None = None
+
+
+def _open_worker_cache(cache_path: str | None):
+    global _worker_cache
+    if cache_path is not None:
+        _worker_cache = PositionCache(cache_path, readonly=True)
+
+
+def _close_worker_cache():
+    global _worker_cache
+    if _worker_cache is not None:
+        _worker_cache.close()
+        _worker_cache = None
+
+
+def _solve_seed(args: tuple[int, int]) -> tuple[DealInfo, list[tuple[int, bool, int]]]:
+    seed, max_nodes = args
+    result = solve(Game(seed=seed), max_nodes=max_nodes, cache=_worker_cache)
+    proven = result.proven if _worker_cache is not None else []
+    return DealInfo(seed, result.winnable, result.nodes, result.solution_length), proven
+
+
+def build_deal_index(
+    path: str,
+    first_seed: int = 0,
+    count: int = 1000,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    processes: int | None = None,
+    progress=None,
+    cache_path: str | None = None,
+):
+    """
+    Solve the deals of count seeds starting at first_seed, using a pool of
+    processes, and write the index to the given path.
+
+    If given, progress is called with each DealInfo as deals are solved,
+    and the positions cached at cache_path are reused, the positions proven
+    winnable or not being added to it.
+    """
+    records = bytearray(count * _RECORD.size)
+    winnable = []
+    tasks = [(seed, max_nodes) for seed in range(first_seed, first_seed + count)]
+    # opened before the workers, which need the file to exist
+    cache = PositionCache(cache_path) if cache_path is not None else None
+    if processes == 1:
+        _open_worker_cache(cache_path)
+        results = map(_solve_seed, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(processes, _open_worker_cache, (cache_path,))
+        results = pool.imap_unordered(_solve_seed, tasks, chunksize=4)
+    try:
+        for info, proven in results:
+            if cache is not None:
+                cache.store_all(proven)
+            if info.winnable:
+                status = _WINNABLE
+                winnable.append((info.nodes, info.seed))
+            else:
+                status = _UNKNOWN if info.winnable is None else _UNWINNABLE
+            _RECORD.pack_into(
+                records,
+                (info.seed - first_seed) * _RECORD.size,
+                status,
+                min(info.solution_length or 0, 0xFFFF),
+                min(info.nodes, 0xFFFFFFFF),
+            )
+            if progress is not None:
+                progress(info)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        else:
+            _close_worker_cache()
+        if cache is not None:
+            cache.close()
+
+    winnable.sort()
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, first_seed, count, len(winnable), max_nodes))
+        f.write(records)
+        f.write(b"".join(_SEED.pack(seed) for _, seed in winnable))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an index of winnable deals")
+    parser.add_argument("path", help="where to write the index")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--count", type=int, default=1000, help="number of seeds to solve")
+    parser.add_argument(
+        "--max-nodes",
+        type=int,
+        default=DEFAULT_MAX_NODES,
+        help="positions searched before giving up on a deal (default: %(default)s)",
+    )
+    parser.add_argument("--processes", type=int, help="worker processes (default: all CPUs)")
+    parser.add_argument("--cache", help="file caching the solved positions between runs")
+    args = parser.parse_args()
+
+    solved = []
+
+    def progress(info: DealInfo):
+        solved.append(info.winnable)
+        if len(solved) % 100 == 0 or len(solved) == args.count:
+            print(f"{len(solved)}/{args.count} deals, {solved.count(True)} winnable")
+
+    build_deal_index(
+        args.path,
+        args.first_seed,
+        args.count,
+        args.max_nodes,
+        args.processes,
+        progress,
+        args.cache,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,15 @@
 
 import random
 
-from .card import Card, Rank
+from .card import ALL_CARDS, RANKS, SUITS, Card, Rank
 
 
 class Deck(object):
-    ranks: list[Rank] = ["A"] + [str(n) for n in range(2, 11)] + list("JQK")  # type: ignore
-    suits = "spades diamonds clubs hearts".split()
+    ranks: list[Rank] = RANKS
+    suits = SUITS
 
     def __init__(self):
-        self._cards = [Card(rank, suit) for suit in self.suits for rank in self.ranks]
+        self._cards: list[Card] = list(ALL_CARDS)
 
     def __len__(self):
         return len(self._cards)
@@ -21,5 +21,5 @@ class Deck(object):
     def __iter__(self):
         return iter(self._cards)
 
-    def shuffle(self):
-        random.shuffle(self._cards)
+    def shuffle(self, rng: random.Random | None = None):
+        (rng or random).shuffle(self._cards)
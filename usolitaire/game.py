@@ -1,8 +1,142 @@
 # -*- coding: utf-8 -*-
 
+import random
+from dataclasses import dataclass
+from enum import Enum
+
+from .card import ALL_CARDS, CARD_INDEX
 from .deck import Card, Deck
 from .exceptions import InvalidMove
-from .utils import rank_diff, suit_color
+from .rules import KLONDIKE, VEGAS_BUY_IN, VEGAS_POINTS_PER_CARD, Rules
+from .utils import RANK_INDEX, SUIT_INDEX, rank_diff, suit_color
+
+
+class MoveType(Enum):
+    DEAL = "deal"
+    RESTORE = "restore"
+    REVEAL = "reveal"
+    WASTE_TO_TABLEAU = "waste-tableau"
+    WASTE_TO_FOUNDATION = "waste-foundation"
+    TABLEAU_TO_FOUNDATION = "tableau-foundation"
+    TABLEAU_TO_TABLEAU = "tableau-tableau"
+
+
+# which of the tableau indexes of a Move are used by each type of move
+_MOVE_FIELDS = {
+    MoveType.DEAL: (),
+    MoveType.RESTORE: (),
+    MoveType.REVEAL: ("source",),
+    MoveType.WASTE_TO_TABLEAU: ("target",),
+    MoveType.WASTE_TO_FOUNDATION: (),
+    MoveType.TABLEAU_TO_FOUNDATION: ("source",),
+    MoveType.TABLEAU_TO_TABLEAU: ("source", "target"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Move:
+    """
+    A move in the game, as listed by Game.legal_moves() and applied by
+    Game.apply_move().
+
+    Source and target are tableau pile indexes, and are None when the move
+    doesn't involve a tableau pile on that side.
+
+    Moves have a compact text form, e.g. "tableau-tableau 1 4" or "deal":
+    >>> Move.parse("waste-tableau 3")
+    Move(type=<MoveType.WASTE_TO_TABLEAU: 'waste-tableau'>, source=None, target=3)
+    """
+
+    type: MoveType
+    source: int | None = None
+    target: int | None = None
+
+    def __str__(self):
+        return " ".join(
+            [self.type.value] + [str(getattr(self, field)) for field in _MOVE_FIELDS[self.type]]
+        )
+
+    @classmethod
+    def parse(cls, text: str) -> "Move":
+        """Parse a move from its text form, raising ValueError if it's not valid"""
+        name, *indexes = text.split()
+        move_type = MoveType(name)
+        fields = _MOVE_FIELDS[move_type]
+        if len(indexes) != len(fields):
+            raise ValueError("Expected %d tableau indexes for %r" % (len(fields), name))
+        values = [int(index) for index in indexes]
+        if any(value not in range(7) for value in values):
+            raise ValueError("Invalid tableau index in %r" % text)
+        return cls(move_type, **dict(zip(fields, values)))
+
+
+_DEAL = Move(MoveType.DEAL)
+_RESTORE = Move(MoveType.RESTORE)
+_WASTE_TO_FOUNDATION = Move(MoveType.WASTE_TO_FOUNDATION)
+_WASTE_TO_TABLEAU = [Move(MoveType.WASTE_TO_TABLEAU, target=i) for i in range(7)]
+_REVEAL = [Move(MoveType.REVEAL, source=i) for i in range(7)]
+_TABLEAU_TO_FOUNDATION = [Move(MoveType.TABLEAU_TO_FOUNDATION, source=i) for i in range(7)]
+_TABLEAU_TO_TABLEAU = [
+    [Move(MoveType.TABLEAU_TO_TABLEAU, source=i, target=j) for j in range(7)] for i in range(7)
+]
+
+# every possible move, legal or not; Game.legal_moves() returns these objects
+ALL_MOVES: list[Move] = [
+    _DEAL,
+    _RESTORE,
+    _WASTE_TO_FOUNDATION,
+    *_WASTE_TO_TABLEAU,
+    *_REVEAL,
+    *_TABLEAU_TO_FOUNDATION,
+    *(move for moves in _TABLEAU_TO_TABLEAU for move in moves),
+]
+
+# redeals left in the position keys of games without a limit on redeals
+_UNLIMITED_REDEALS = 255
+
+
+def _redeals_byte(rules: Rules, redeals_left: int) -> int:
+    return _UNLIMITED_REDEALS if rules.max_redeals is None else redeals_left
+
+
+_KINGS = tuple(card for card in ALL_CARDS if card.rank == "K")
+
+# cards that can be placed on top of each card in the tableau
+_TABLEAU_PREDECESSORS = {
+    card: tuple(
+        other
+        for other in ALL_CARDS
+        if rank_diff(other.rank, card.rank) == 1 and suit_color(other.suit) != suit_color(card.suit)
+    )
+    for card in ALL_CARDS
+}
+
+
+# cards of each suit, in the order they go to the foundations
+_SUIT_SEQUENCES = [[Card(rank, suit) for rank in Deck.ranks] for suit in Deck.suits]
+
+_SAME_COLOR_SUIT = {
+    "spades": "clubs",
+    "clubs": "spades",
+    "diamonds": "hearts",
+    "hearts": "diamonds",
+}
+
+
+def _suit_swap(colors: tuple[str, ...]) -> tuple[dict[Card, int], tuple[int, ...]]:
+    """
+    Index of each card once the suits of the given colors are swapped, and
+    the foundation piles in the swapped order.
+    """
+    swapped = {
+        suit: _SAME_COLOR_SUIT[suit] if suit_color(suit) in colors else suit for suit in Deck.suits
+    }
+    card_indexes = {card: CARD_INDEX[Card(card.rank, swapped[card.suit])] for card in ALL_CARDS}
+    return card_indexes, tuple(SUIT_INDEX[swapped[suit]] for suit in Deck.suits)
+
+
+# swapping the two suits of a color changes nothing to what can be played
+_SUIT_SWAPS = [_suit_swap(colors) for colors in ((), ("black",), ("red",), ("black", "red"))]
 
 
 class Game(object):
@@ -16,6 +150,14 @@ class Game(object):
     The top card of each pile is face up; all others are face down.
     The remaining cards are placed face down to form the stock.
 
+    Cards are shared, immutable objects, so the game keeps track of which
+    ones are facing up: cards in the stock are facing down, cards in the waste
+    and in the foundations are facing up, and each tableau pile has
+    ``face_down_counts[i]`` cards facing down at its bottom.
+
+    Each foundation pile holds a single suit, in the order of ``Deck.suits``,
+    so the pile a card goes to is known from its suit alone.
+
     How to use:
     >>> game = Game()
     >>> game.deal_from_stock()
@@ -23,20 +165,151 @@ class Game(object):
     >>> game.move_tableau_pile(0, 1) # moving a pile
     >>> game.move_tableau_pile(1, 2) # moving another pile
     >>> game.move_from_waste_to_tableau(0)
+
+    The rules default to drawing one card at a time with unlimited redeals,
+    other variants can be given, see usolitaire.rules.
+
+    Passing a seed makes the deal reproducible:
+    >>> Game(seed=42).stock == Game(seed=42).stock
+    True
     """
 
-    def __init__(self):
+    __slots__ = (
+        "waste",
+        "tableau",
+        "face_down_counts",
+        "stock",
+        "foundations",
+        "stock_cycle_cards",
+        "rules",
+        "redeals_left",
+        "_deal",
+    )
+
+    def __init__(self, seed: int | None = None, rules: Rules = KLONDIKE):
+        self.rules = rules
+        self.redeals_left = rules.initial_redeals
+        self._deal = rules.deal_function
         deck = Deck()
-        deck.shuffle()
+        deck.shuffle(random.Random(seed) if seed is not None else None)
         cards: list[Card] = list(deck)
         self.waste: list[Card] = []
         self.tableau: list[list[Card]] = []
         for n in range(1, 8):
             self.tableau.append([cards.pop() for _ in range(n)])  # type: ignore
-        for pile in self.tableau:
-            pile[-1].face_up = True
+        self.face_down_counts: list[int] = [len(pile) - 1 for pile in self.tableau]
         self.stock = list(cards)
         self.foundations = [[], [], [], []]
+        # cards that can still be reached by dealing from the stock
+        self.stock_cycle_cards: set[Card] = set(self.stock)
+
+    def copy(self) -> "Game":
+        """Return an independent copy of the game"""
+        game = self.__class__.__new__(self.__class__)
+        game.rules = self.rules
+        game.redeals_left = self.redeals_left
+        game._deal = self._deal
+        game.waste = self.waste[:]
+        game.tableau = [pile[:] for pile in self.tableau]
+        game.face_down_counts = self.face_down_counts[:]
+        game.stock = self.stock[:]
+        game.foundations = [pile[:] for pile in self.foundations]
+        game.stock_cycle_cards = set(self.stock_cycle_cards)
+        return game
+
+    def position_key(self) -> bytes:
+        """
+        Encode the position as bytes, so that two games have the same key
+        exactly when they are in the same position.
+        """
+        separator = 255
+        card_index = CARD_INDEX.__getitem__
+        key = list(map(card_index, self.stock))
+        key.append(separator)
+        key.extend(map(card_index, self.waste))
+        for pile, face_down_count in zip(self.tableau, self.face_down_counts):
+            key.append(separator)
+            key.append(face_down_count)
+            key.extend(map(card_index, pile))
+        key.append(separator)
+        key.extend(map(len, self.foundations))
+        key.append(self.rules.draw_count)
+        key.append(_redeals_byte(self.rules, self.redeals_left))
+        return bytes(key)
+
+    def canonical_key(self) -> bytes:
+        """
+        Like position_key(), but the same for positions that only differ by
+        the order of the tableau piles or by swapping the two suits of a
+        color, since they are won the same way. It's the position key of
+        one of these positions.
+        """
+        separator = 255
+        redeals_byte = _redeals_byte(self.rules, self.redeals_left)
+        starts = []
+        for card_indexes, foundation_order in _SUIT_SWAPS:
+            card_index = card_indexes.__getitem__
+            key = list(map(card_index, self.stock))
+            key.append(separator)
+            key.extend(map(card_index, self.waste))
+            starts.append((key, card_index, foundation_order))
+        # keys start with the stock and the waste, which are usually enough to
+        # tell the suit swap making the smallest key
+        smallest_start = min(key for key, _, _ in starts)
+        smallest_starts = [start for start in starts if start[0] == smallest_start]
+        keys = []
+        for key, card_index, foundation_order in smallest_starts:
+            piles = sorted(
+                [face_down_count, *map(card_index, pile)]
+                for pile, face_down_count in zip(self.tableau, self.face_down_counts)
+            )
+            for pile in piles:
+                key.append(separator)
+                key.extend(pile)
+            key.append(separator)
+            key.extend(len(self.foundations[i]) for i in foundation_order)
+            key.append(self.rules.draw_count)
+            key.append(redeals_byte)
+            keys.append(key)
+        return bytes(min(keys))
+
+    @classmethod
+    def from_position_key(cls, key: bytes, rules: Rules = KLONDIKE) -> "Game":
+        """Make a game in the position encoded by position_key()"""
+        *piles, foundation_heights = key[:-2].split(b"\xff")
+        draw_count, redeals_byte = key[-2:]
+        if rules.max_redeals is None:
+            valid_redeals = redeals_byte == _UNLIMITED_REDEALS
+            redeals_left = rules.initial_redeals
+        else:
+            valid_redeals = redeals_byte <= rules.max_redeals
+            redeals_left = redeals_byte
+        if (
+            len(piles) != 9
+            or len(foundation_heights) != 4
+            or draw_count != rules.draw_count
+            or not valid_redeals
+        ):
+            raise ValueError("Not a position key for these rules: %r" % key)
+        game = cls.__new__(cls)
+        game.rules = rules
+        game.redeals_left = redeals_left
+        game._deal = rules.deal_function
+        game.stock = [ALL_CARDS[i] for i in piles[0]]
+        game.waste = [ALL_CARDS[i] for i in piles[1]]
+        game.face_down_counts = [pile[0] for pile in piles[2:]]
+        game.tableau = [[ALL_CARDS[i] for i in pile[1:]] for pile in piles[2:]]
+        game.foundations = [
+            [Card(rank, suit) for rank in Deck.ranks[:height]]
+            for suit, height in zip(Deck.suits, foundation_heights)
+        ]
+        game.stock_cycle_cards = set(game.stock)
+        game.stock_cycle_cards.update(game.waste)
+        return game
+
+    def snapshot(self) -> "GameSnapshot":
+        """Return an immutable copy of the position, see GameSnapshot"""
+        return GameSnapshot(self)
 
     def _reset_game_to_almost_won_state(self):
         """
@@ -45,12 +318,11 @@ class Game(object):
         """
         deck = Deck()
         cards: list[Card] = list(deck)
-        for c in cards:  # type: ignore
-            c.face_up = True
         self.waste = []
         self.tableau = []
         for n in range(1, 8):
             self.tableau.append([])
+        self.face_down_counts = [0] * 7
         self.foundations = [
             cards[0:13],
             cards[13 : 13 * 2],
@@ -59,44 +331,68 @@ class Game(object):
         ]  # type: ignore
         self.stock = []
         self.waste = [cards[-1]]
+        self.stock_cycle_cards = set(self.waste)
 
     def deal_from_stock(self):
-        """Deal one card from stock to waste"""
+        """Deal one card, or three depending on the rules, from stock to waste"""
         if not self.stock:
             raise InvalidMove("No cards in stock")
-        self.waste.append(self.stock.pop())
-        self.waste[-1].face_up = True
+        self._deal(self.stock, self.waste)
+
+    def can_restore_stock(self) -> bool:
+        """Check if the stock is empty and can be restored from the waste"""
+        return not self.stock and bool(self.waste) and self.redeals_left > 0
 
     def restore_stock(self):
         """Restore stock from waste"""
-        self.stock[:] = list(reversed(self.waste))
-        for card in self.stock:
-            card.face_up = False
+        if not self.can_restore_stock():
+            raise InvalidMove("Stock can only be restored when it's empty")
+        self.stock[:] = self.waste[::-1]
         self.waste[:] = []
+        self.redeals_left -= self.rules.redeal_cost
+
+    def is_tableau_card_face_up(self, tableau_index, card_index) -> bool:
+        """Check if the card at the given position of a tableau pile is facing up"""
+        assert tableau_index in range(7), "Invalid index: %r" % tableau_index
+        return card_index >= self.face_down_counts[tableau_index]
 
-    def _is_valid_move_to_tableau(self, source_card, target_card):
-        """Check if the given card can be moved to the given tableau pile"""
-        if target_card is None:
+    def reveal_tableau_card(self, index):
+        """Turn the top card of the given tableau pile face up"""
+        assert index in range(7), "Invalid index: %r" % index
+        pile = self.tableau[index]
+        if not pile or self.face_down_counts[index] < len(pile):
+            raise InvalidMove("No card facing down on top of the pile")
+        self.face_down_counts[index] -= 1
+
+    def _is_valid_move_to_tableau(self, source_card, target_index):
+        """
+        Check if the given card can be moved to the given tableau pile.
+        The source card is assumed to be facing up.
+        """
+        target_pile = self.tableau[target_index]
+        if not target_pile:
             return source_card.rank == "K"
-        if not source_card.face_up or not target_card.face_up:
+        if self.face_down_counts[target_index] == len(target_pile):
             return False
+        target_card = target_pile[-1]
         diff = rank_diff(source_card.rank, target_card.rank)
         return diff == 1 and suit_color(source_card.suit) != suit_color(target_card.suit)
 
     def can_move_card_to_tableau(self, card, tableau_index):
-        """Check if the given card can be moved to the given tableau pile"""
+        """
+        Check if the given card can be moved to the given tableau pile.
+        The card is assumed to be facing up.
+        """
         assert tableau_index in range(7)
-        target_pile = self.tableau[tableau_index]
-        target_card = target_pile[-1] if target_pile else None
-        return self._is_valid_move_to_tableau(card, target_card)
+        return self._is_valid_move_to_tableau(card, tableau_index)
 
     def move_from_waste_to_tableau(self, target_index):
         """Move card from waste to tableau"""
         assert target_index in range(7)
-        target_pile = self.tableau[target_index]
-        target_card = target_pile[-1] if target_pile else None
-        if self.waste and self._is_valid_move_to_tableau(self.waste[-1], target_card):
-            target_pile.append(self.waste.pop())
+        if self.waste and self._is_valid_move_to_tableau(self.waste[-1], target_index):
+            card = self.waste.pop()
+            self.stock_cycle_cards.discard(card)
+            self.tableau[target_index].append(card)
         else:
             raise InvalidMove()
 
@@ -115,29 +411,36 @@ class Game(object):
         assert target_index in range(7), "Invalid index: %r" % target_index
         if src_index == target_index:
             raise InvalidMove("Source is same as destination")
-        source_pile, target_pile = self.tableau[src_index], self.tableau[target_index]
-        target_card = target_pile[-1] if target_pile else None
-        for index, card in list(enumerate(source_pile))[::-1]:
-            if self._is_valid_move_to_tableau(card, target_card):
-                to_move = source_pile[index:]
-                target_pile.extend(to_move)
-                for _ in range(len(to_move)):
-                    source_pile.pop()
-                return
-        raise InvalidMove()
+        index = self._find_movable_index(src_index, target_index)
+        if index is None:
+            raise InvalidMove()
+        source_pile = self.tableau[src_index]
+        self.tableau[target_index].extend(source_pile[index:])
+        del source_pile[index:]
+
+    def can_move_tableau_pile(self, src_index, target_index) -> bool:
+        """Check if any of the cards facing up can be moved to the given tableau pile"""
+        return src_index != target_index and (
+            self._find_movable_index(src_index, target_index) is not None
+        )
+
+    def _find_movable_index(self, src_index, target_index):
+        """
+        Find the index of the card in the source pile that can be moved to
+        the target pile, along with the cards on top of it.
+        """
+        source_pile = self.tableau[src_index]
+        for index in range(len(source_pile) - 1, self.face_down_counts[src_index] - 1, -1):
+            if self._is_valid_move_to_tableau(source_pile[index], target_index):
+                return index
+        return None
 
     def _find_foundation_pile(self, card_to_move):
         """Find a foundation pile where the given card can be moved"""
-        for pile in self.foundations:
-            if any(
-                [
-                    not pile and card_to_move.rank == "A",
-                    pile
-                    and card_to_move.suit == pile[-1].suit
-                    and rank_diff(card_to_move.rank, pile[-1].rank) == -1,
-                ]
-            ):
-                return pile
+        pile = self.foundations[SUIT_INDEX[card_to_move.suit]]
+        if len(pile) == RANK_INDEX[card_to_move.rank]:
+            return pile
+        return None
 
     def move_to_foundation_from_waste(self):
         """
@@ -149,7 +452,9 @@ class Game(object):
         foundation_pile = self._find_foundation_pile(self.waste[-1])
         if foundation_pile is None:
             raise InvalidMove()
-        foundation_pile.append(self.waste.pop())
+        card = self.waste.pop()
+        self.stock_cycle_cards.discard(card)
+        foundation_pile.append(card)
 
     def can_move_to_foundation_from_waste(self) -> bool:
         """
@@ -167,13 +472,10 @@ class Game(object):
         """
         assert index in range(7), "Invalid index: %r" % index
         pile = self.tableau[index]
-        if not pile:
-            raise InvalidMove()
-        card_to_move = pile[-1]
-        if not card_to_move.face_up:
+        if len(pile) <= self.face_down_counts[index]:
             raise InvalidMove()
 
-        foundation_pile = self._find_foundation_pile(card_to_move)
+        foundation_pile = self._find_foundation_pile(pile[-1])
         if foundation_pile is None:
             raise InvalidMove()
         foundation_pile.append(pile.pop())
@@ -184,14 +486,207 @@ class Game(object):
         """
         assert index in range(7), "Invalid index: %r" % index
         pile = self.tableau[index]
-        if not pile:
+        if len(pile) <= self.face_down_counts[index]:
             return False
-        card_to_move = pile[-1]
-        if not card_to_move.face_up:
-            return False
-        foundation_pile = self._find_foundation_pile(card_to_move)
+        foundation_pile = self._find_foundation_pile(pile[-1])
         return foundation_pile is not None
 
     def won(self):
         """Check if the game is won"""
-        return all(len(pile) == 13 for pile in self.foundations)
+        return sum(map(len, self.foundations)) == 52
+
+    def score(self) -> int | None:
+        """Return the score of the game, if the rules have scoring"""
+        if not self.rules.vegas_scoring:
+            return None
+        return VEGAS_POINTS_PER_CARD * sum(map(len, self.foundations)) - VEGAS_BUY_IN
+
+    def is_dead_end(self) -> bool:
+        """
+        Check if the game can't make progress anymore, which means it can't
+        be won: no card facing down can be revealed, no card can go to the
+        foundations, no pile can be moved other than swapping a whole pile
+        to an empty one, and none of the cards reachable by dealing from the
+        stock can be played.
+
+        The stock cards are tracked as moves are made, so only the cards
+        accepted by the foundations and the piles need to be looked up.
+        Once the stock is empty and can't be restored anymore, only the top
+        card of the waste can still be played.
+        """
+        if self.won():
+            return False
+        stock_cycle_cards = self.stock_cycle_cards
+        if not self.stock and not self.can_restore_stock():
+            stock_cycle_cards = set(self.waste[-1:])
+        for suit_index, pile in enumerate(self.foundations):
+            if len(pile) < 13 and _SUIT_SEQUENCES[suit_index][len(pile)] in stock_cycle_cards:
+                return False
+
+        face_up_cards_piles = {}
+        for i, pile in enumerate(self.tableau):
+            face_down_count = self.face_down_counts[i]
+            if not pile:
+                continue
+            if face_down_count == len(pile) or self.can_move_to_foundation_from_tableau(i):
+                return False
+            for index in range(face_down_count, len(pile)):
+                face_up_cards_piles[pile[index]] = (i, index)
+
+        for j, pile in enumerate(self.tableau):
+            accepted_cards = _TABLEAU_PREDECESSORS[pile[-1]] if pile else _KINGS
+            for card in accepted_cards:
+                if card in stock_cycle_cards:
+                    return False
+                location = face_up_cards_piles.get(card)
+                if location is None or location[0] == j:
+                    continue
+                # swapping a whole pile to an empty one doesn't help
+                if pile or location[1]:
+                    return False
+        return True
+
+    def legal_moves(self) -> list[Move]:
+        """List all the moves that can be applied in the current position"""
+        moves = []
+        if self.stock:
+            moves.append(_DEAL)
+        elif self.can_restore_stock():
+            moves.append(_RESTORE)
+        if self.can_move_to_foundation_from_waste():
+            moves.append(_WASTE_TO_FOUNDATION)
+        if self.waste:
+            card = self.waste[-1]
+            for i in range(7):
+                if self._is_valid_move_to_tableau(card, i):
+                    moves.append(_WASTE_TO_TABLEAU[i])
+        foundations = self.foundations
+        face_up_cards_piles = {}
+        for i, pile in enumerate(self.tableau):
+            face_down_count = self.face_down_counts[i]
+            if face_down_count == len(pile):
+                if pile:
+                    moves.append(_REVEAL[i])
+                continue
+            top_card = pile[-1]
+            if len(foundations[SUIT_INDEX[top_card.suit]]) == RANK_INDEX[top_card.rank]:
+                moves.append(_TABLEAU_TO_FOUNDATION[i])
+            for card in pile[face_down_count:]:
+                face_up_cards_piles[card] = i
+
+        # instead of trying every pair of piles, look up where the (at most
+        # two) cards that each pile accepts are
+        pile_moves = []
+        for j, pile in enumerate(self.tableau):
+            if not pile:
+                accepted_cards = _KINGS
+            elif self.face_down_counts[j] < len(pile):
+                accepted_cards = _TABLEAU_PREDECESSORS[pile[-1]]
+            else:
+                continue
+            for card in accepted_cards:
+                i = face_up_cards_piles.get(card)
+                if i is not None and i != j:
+                    pile_moves.append((i, j))
+        pile_moves.sort()
+        moves.extend(_TABLEAU_TO_TABLEAU[i][j] for i, j in pile_moves)
+        return moves
+
+    def apply_move(self, move: Move):
+        """Apply the given move, raising InvalidMove if it can't be done"""
+        move_type = move.type
+        if move_type is MoveType.DEAL:
+            self.deal_from_stock()
+        elif move_type is MoveType.RESTORE:
+            self.restore_stock()
+        elif move_type is MoveType.REVEAL:
+            self.reveal_tableau_card(move.source)
+        elif move_type is MoveType.WASTE_TO_TABLEAU:
+            self.move_from_waste_to_tableau(move.target)
+        elif move_type is MoveType.WASTE_TO_FOUNDATION:
+            self.move_to_foundation_from_waste()
+        elif move_type is MoveType.TABLEAU_TO_FOUNDATION:
+            self.move_to_foundation_from_tableau(move.source)
+        else:
+            self.move_tableau_pile(move.source, move.target)
+
+
+class GameSnapshot(object):
+    """
+    Immutable copy of a game position, that other threads can read while
+    the game goes on.
+
+    Cards are shared between all games, so a snapshot only copies the piles
+    into tuples. It's pickled as its position key, a few dozen bytes, so
+    it's also cheap to send to other processes, which can get a game to
+    play with from it:
+    >>> snapshot = Game(seed=42).snapshot()
+    >>> snapshot.to_game().position_key() == snapshot.position_key()
+    True
+    """
+
+    __slots__ = (
+        "waste",
+        "tableau",
+        "face_down_counts",
+        "stock",
+        "foundations",
+        "rules",
+        "redeals_left",
+        "_key",
+    )
+
+    def __init__(self, game: Game, key: bytes | None = None):
+        # the key is only encoded when needed, the first time it's asked for
+        set_attribute = object.__setattr__
+        set_attribute(self, "rules", game.rules)
+        set_attribute(self, "redeals_left", game.redeals_left)
+        set_attribute(self, "stock", tuple(game.stock))
+        set_attribute(self, "waste", tuple(game.waste))
+        set_attribute(self, "tableau", tuple(map(tuple, game.tableau)))
+        set_attribute(self, "face_down_counts", tuple(game.face_down_counts))
+        set_attribute(self, "foundations", tuple(map(tuple, game.foundations)))
+        set_attribute(self, "_key", key)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameSnapshot objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("GameSnapshot objects are immutable")
+
+    def __reduce__(self):
+        rules = self.rules
+        return (
+            _snapshot_from_position_key,
+            (self.position_key(), rules.draw_count, rules.max_redeals, rules.vegas_scoring),
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, GameSnapshot):
+            return NotImplemented
+        return self.position_key() == other.position_key() and self.rules == other.rules
+
+    def __hash__(self):
+        return hash(self.position_key())
+
+    def position_key(self) -> bytes:
+        """Same as Game.position_key()"""
+        if self._key is None:
+            # the encoding only reads the attributes snapshots share with games
+            object.__setattr__(self, "_key", Game.position_key(self))  # type: ignore
+        return self._key  # type: ignore
+
+    def to_game(self) -> Game:
+        """Return a new game in the position of the snapshot"""
+        return Game.from_position_key(self.position_key(), self.rules)
+
+    def won(self):
+        """Check if the game is won"""
+        return sum(map(len, self.foundations)) == 52
+
+
+def _snapshot_from_position_key(
+    key: bytes, draw_count: int, max_redeals: int | None, vegas_scoring: bool
+) -> GameSnapshot:
+    rules = Rules(draw_count, max_redeals, vegas_scoring)
+    return GameSnapshot(Game.from_position_key(key, rules), key)
@@ -0,0 +1,111 @@
+"""
+Load generator for the game server, for benchmarking it.
+
+Runs a number of concurrent clients, each playing random legal moves on
+seeded games, and reports how many moves per second the server handled.
+
+Run with:
+
+    python -m usolitaire.loadgen --socket /tmp/usolitaire.sock --clients 8
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from usolitaire.server import DEFAULT_PORT
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+async def _request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, request: dict):
+    writer.write(_encode(request).encode() + b"\n")
+    response = json.loads(await reader.readline())
+    if not response["ok"]:
+        raise RuntimeError("Server error: %s" % response["error"])
+    return response
+
+
+async def run_client(
+    connect,
+    seed: int,
+    deadline: float,
+    moves_per_game: int = 500,
+) -> int:
+    """Play random games until the deadline, returning the number of moves made"""
+    reader, writer = await connect()
+    rng = random.Random(seed)
+    moves_made = 0
+    try:
+        while time.monotonic() < deadline:
+            response = await _request(
+                reader, writer, {"op": "new", "seed": rng.randrange(2**32), "moves": True}
+            )
+            session = response["session"]
+            for _ in range(moves_per_game):
+                if not response["moves"] or response.get("won"):
+                    break
+                response = await _request(
+                    reader,
+                    writer,
+                    {
+                        "op": "move",
+                        "session": session,
+                        "move": rng.choice(response["moves"]),
+                        "moves": True,
+                    },
+                )
+                moves_made += 1
+            await _request(reader, writer, {"op": "close", "session": session})
+    finally:
+        writer.close()
+    return moves_made
+
+
+async def run_load(
+    path: str | None = None,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    clients: int = 8,
+    duration: float = 10.0,
+    seed: int = 0,
+) -> int:
+    """Run the given number of clients for a while, returning the total of moves made"""
+    if path:
+
+        def connect():
+            return asyncio.open_unix_connection(path)
+    else:
+
+        def connect():
+            return asyncio.open_connection(host, port)
+
+    deadline = time.monotonic() + duration
+    results = await asyncio.gather(
+        *(run_client(connect, seed + i, deadline) for i in range(clients))
+    )
+    return sum(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", help="Unix socket path of the server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    moves = asyncio.run(
+        run_load(args.socket, args.host, args.port, args.clients, args.duration, args.seed)
+    )
+    elapsed = time.monotonic() - start
+    print(f"{moves} moves in {elapsed:.1f}s: {moves / elapsed:.0f} moves/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Policies playing Klondike games on their own, for bots and for comparing
+move-ordering heuristics with usolitaire.tournament.
+
+A policy is given a position and its legal moves and picks one of them,
+or None to give up:
+
+    class FoundationFirst(Policy):
+        name = "foundation-first"
+
+        def choose_move(self, game, legal_moves, rng):
+            foundation_moves = [
+                move for move in legal_moves if move.type is MoveType.TABLEAU_TO_FOUNDATION
+            ]
+            return rng.choice(foundation_moves or legal_moves) if legal_moves else None
+
+A new policy object is created for each game, so policies can keep state
+between their moves. They must only use rng for their random choices, so
+that games are reproducible.
+"""
+
+import importlib
+import random
+
+from usolitaire.game import Game, Move
+from usolitaire.solver import ordered_moves, solve
+
+
+class Policy(object):
+    name = "policy"
+
+    def choose_move(self, game: Game, legal_moves: list[Move], rng: random.Random) -> Move | None:
+        """Pick the move to play in the given position, None to give up"""
+        raise NotImplementedError
+
+
+class RandomPolicy(Policy):
+    """Plays any legal move"""
+
+    name = "random"
+
+    def choose_move(self, game, legal_moves, rng):
+        return rng.choice(legal_moves) if legal_moves else None
+
+
+class GreedyPolicy(Policy):
+    """
+    Plays the move the solver would try first, skipping the moves going
+    back to a position already played. Gives up when every move does.
+    """
+
+    name = "greedy"
+
+    def __init__(self):
+        self.seen = set()
+
+    def choose_move(self, game, legal_moves, rng):
+        self.seen.add(game.position_key())
+        for move in ordered_moves(game):
+            child = game.copy()
+            child.apply_move(move)
+            key = child.position_key()
+            if key not in self.seen:
+                return move
+        return None
+
+
+def _progress(game: Game) -> tuple[int, int]:
+    return sum(map(len, game.foundations)), sum(game.face_down_counts)
+
+
+class SearchPolicy(GreedyPolicy):
+    """
+    Searches for a way to win with a bounded number of nodes, and plays it
+    when found. Plays greedily while no solution is known, searching again
+    once cards were revealed or sent to the foundations.
+    """
+
+    name = "search"
+    max_nodes = 2000
+
+    def __init__(self):
+        super().__init__()
+        self.plan: list[Move] = []
+        self.searched_progress = None
+
+    def choose_move(self, game, legal_moves, rng):
+        if not self.plan and _progress(game) != self.searched_progress:
+            self.searched_progress = _progress(game)
+            result = solve(game, max_nodes=self.max_nodes)
+            if result.winnable:
+                self.plan = list(reversed(result.solution))
+        if self.plan:
+            self.seen.add(game.position_key())
+            return self.plan.pop()
+        return super().choose_move(game, legal_moves, rng)
+
+
+POLICIES = {policy.name: policy for policy in (RandomPolicy, GreedyPolicy, SearchPolicy)}
+
+
+def load_policy(name: str) -> type[Policy]:
+    """Find a policy by name, or by import path like package.module:PolicyClass"""
+    if name in POLICIES:
+        return POLICIES[name]
+    module_name, _, attribute = name.partition(":")
+    if not attribute:
+        raise ValueError("Unknown policy: %r" % name)
+    policy = getattr(importlib.import_module(module_name), attribute)
+    if not (isinstance(policy, type) and issubclass(policy, Policy)):
+        raise ValueError("Not a policy class: %r" % name)
+    return policy
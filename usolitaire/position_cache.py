@@ -0,0 +1,150 @@
+"""
+Persistent cache of positions known to be winnable or unwinnable.
+
+The cache is a fixed-size, open-addressed hash table stored in a file and
+memory-mapped, so solver runs can reuse what previous runs found, and
+several processes can read it at the same time while a single one writes.
+
+Layout of the file, in native byte order:
+
+- a header: magic, number of buckets, generation and a reserved word
+- the buckets, each having SLOTS_PER_BUCKET slots of two 64 bits words:
+  the position hash (0 for an empty slot) and its data, which is
+  generation << 32 | distance << 1 | winnable
+
+A position is always looked up in the bucket selected by its hash, slots
+being filled in order. When a bucket is full, the entry written in the
+oldest generation (every writer opening the file starts a new one) is
+replaced, which bounds the size of the cache.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+
+from usolitaire.game import Game
+
+MAGIC = b"USOLPC1\0"
+SLOTS_PER_BUCKET = 8
+DEFAULT_BUCKETS = 1 << 16  # 8 MiB
+
+_HEADER = struct.Struct("=8sQQQ")
+_WORDS_PER_SLOT = 2
+_WORDS_PER_BUCKET = SLOTS_PER_BUCKET * _WORDS_PER_SLOT
+_BUCKET_SIZE = _WORDS_PER_BUCKET * 8
+_MAX_DISTANCE = (1 << 31) - 1
+
+
+def hash_position_key(key: bytes) -> int:
+    """Hash a key returned by Game.position_key() into a non-zero 64 bits integer"""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+def position_hash(game: Game) -> int:
+    """Hash the position of the given game, for looking it up in a PositionCache"""
+    return hash_position_key(game.position_key())
+
+
+class PositionCache(object):
+    """
+    Memory-mapped cache of positions known to be winnable or not.
+
+    For each position, the cache keeps whether it's winnable and, if it is,
+    the number of moves needed to win from it.
+
+    How to use:
+    >>> with PositionCache("positions.cache") as cache:  # doctest: +SKIP
+    ...     cache.store(position_hash(game), True, 12)
+    ...     cache.lookup(position_hash(game))
+    (True, 12)
+
+    Opening the cache with readonly=True maps it read-only, and is how worker
+    processes should use it: they send what they find to the process owning
+    the writable cache.
+    """
+
+    def __init__(self, path: str, readonly: bool = False, buckets: int = DEFAULT_BUCKETS):
+        if buckets & (buckets - 1):
+            raise ValueError("Number of buckets must be a power of two")
+        self.path = path
+        self.readonly = readonly
+        if not readonly and not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, buckets, 0, 0))
+                f.truncate(_HEADER.size + buckets * _BUCKET_SIZE)
+
+        with open(path, "rb" if readonly else "r+b") as f:
+            self._mmap = mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ if readonly else mmap.ACCESS_WRITE
+            )
+        magic, self.buckets, generation, _ = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or len(self._mmap) != _HEADER.size + self.buckets * _BUCKET_SIZE:
+            self._mmap.close()
+            raise ValueError("Not a position cache file: %r" % path)
+        if not readonly:
+            generation = (generation + 1) & 0xFFFFFFFF
+            _HEADER.pack_into(self._mmap, 0, MAGIC, self.buckets, generation, 0)
+        self.generation = generation
+        self._mask = self.buckets - 1
+        self._words = memoryview(self._mmap)[_HEADER.size :].cast("Q")
+
+    def close(self):
+        if self._words is not None:
+            self._words.release()
+            self._words = None
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        words = self._words
+        return sum(1 for i in range(0, len(words), _WORDS_PER_SLOT) if words[i])
+
+    def lookup(self, position_hash: int) -> tuple[bool, int] | None:
+        """Return whether the position is winnable and in how many moves, if known"""
+        words = self._words
+        start = (position_hash & self._mask) * _WORDS_PER_BUCKET
+        for i in range(start, start + _WORDS_PER_BUCKET, _WORDS_PER_SLOT):
+            key = words[i]
+            if key == position_hash:
+                data = words[i + 1]
+                return bool(data & 1), (data & 0xFFFFFFFF) >> 1
+            if not key:
+                return None
+        return None
+
+    def store(self, position_hash: int, winnable: bool, distance: int = 0):
+        """Record whether a position is winnable, and in how many moves"""
+        if self.readonly:
+            raise ValueError("Position cache is read-only")
+        words = self._words
+        data = self.generation << 32 | min(distance, _MAX_DISTANCE) << 1 | bool(winnable)
+        start = (position_hash & self._mask) * _WORDS_PER_BUCKET
+        end = start + _WORDS_PER_BUCKET
+        for i in range(start, end, _WORDS_PER_SLOT):
+            key = words[i]
+            if key == position_hash:
+                words[i + 1] = data
+                return
+            if not key:
+                break
+        else:
+            i = min(range(start, end, _WORDS_PER_SLOT), key=lambda i: words[i + 1] >> 32)
+            # clear the slot first, so concurrent readers never see the
+            # replaced key with the new data
+            words[i] = 0
+        words[i + 1] = data
+        words[i] = position_hash
+
+    def store_all(self, entries):
+        """Store (position hash, winnable, distance) entries, e.g. from SolveResult.proven"""
+        for position_hash, winnable, distance in entries:
+            self.store(position_hash, winnable, distance)
+
+    def flush(self):
+        self._mmap.flush()
@@ -0,0 +1,52 @@
+"""
+Accounting of the output written to the terminal, to find the actions
+that are expensive to repaint, e.g. when playing over a slow connection.
+"""
+
+from collections import defaultdict
+
+from textual.driver import Driver
+
+
+class OutputStats(object):
+    """
+    Bytes written to the terminal, per action.
+
+    Frames are written some time after the action changing the screen, so
+    all the output is counted for the last action started.
+    """
+
+    def __init__(self):
+        self.action = "startup"
+        self.actions = defaultdict(int)
+        self.bytes_written = defaultdict(int)
+        self.writes = defaultdict(int)
+
+    def start_action(self, action: str):
+        self.action = action
+        self.actions[action] += 1
+
+    def count(self, data: str):
+        self.bytes_written[self.action] += len(data.encode("utf-8"))
+        self.writes[self.action] += 1
+
+    def report(self) -> str:
+        lines = [f"{'action':<20} {'count':>6} {'writes':>7} {'bytes':>10} {'bytes/action':>13}"]
+        for action, total in sorted(self.bytes_written.items(), key=lambda item: -item[1]):
+            count = self.actions[action] or 1
+            lines.append(
+                f"{action:<20} {count:>6} {self.writes[action]:>7} {total:>10} {total // count:>13}"
+            )
+        lines.append(f"{'total':<20} {'':>6} {'':>7} {sum(self.bytes_written.values()):>10}")
+        return "\n".join(lines)
+
+
+def counting_driver(driver_class: type[Driver], stats: OutputStats) -> type[Driver]:
+    """Make a driver class counting what it writes in the given stats"""
+
+    class CountingDriver(driver_class):
+        def write(self, data: str) -> None:
+            stats.count(data)
+            super().write(data)
+
+    return CountingDriver
@@ -0,0 +1,82 @@
+"""
+Replays of recorded games, that can be shown at any move number.
+
+The position every keyframe_interval moves is kept as a position key, and
+the moves in between are replayed from the closest keyframe, so seeking
+to any move applies at most keyframe_interval - 1 moves, however long the
+game is.
+"""
+
+from usolitaire.game import Game, Move
+
+DEFAULT_KEYFRAME_INTERVAL = 32
+
+
+class Replay(object):
+    """
+    Recorded game.
+
+    How to use:
+    >>> replay = Replay(Game(seed=1), [Move.parse("deal"), Move.parse("deal")])
+    >>> len(replay.position(2).waste)
+    2
+    """
+
+    def __init__(
+        self,
+        initial: Game,
+        moves: list[Move],
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    ):
+        assert keyframe_interval > 0, "Invalid keyframe interval: %r" % keyframe_interval
+        self.rules = initial.rules
+        self.moves = list(moves)
+        self.keyframe_interval = keyframe_interval
+        self.keyframes: list[bytes] = []
+        game = initial.copy()
+        for move_number in range(len(self.moves) + 1):
+            if move_number % keyframe_interval == 0:
+                self.keyframes.append(game.position_key())
+            if move_number < len(self.moves):
+                game.apply_move(self.moves[move_number])
+
+    def __len__(self):
+        return len(self.moves)
+
+    def position(self, move_number: int) -> Game:
+        """Return the game after the given number of moves"""
+        assert 0 <= move_number <= len(self.moves), "Invalid move number: %r" % move_number
+        keyframe = move_number // self.keyframe_interval
+        game = Game.from_position_key(self.keyframes[keyframe], self.rules)
+        for move in self.moves[keyframe * self.keyframe_interval : move_number]:
+            game.apply_move(move)
+        return game
+
+    def seek(self, game: Game, move_number: int, target: int) -> Game:
+        """
+        Return the game after target moves, given the game after move_number
+        moves, which is left unchanged. Moves are applied to a copy of the
+        given game when there are less of them than from the keyframe.
+        """
+        if move_number <= target and target - move_number <= target % self.keyframe_interval:
+            game = game.copy()
+            for move in self.moves[move_number:target]:
+                game.apply_move(move)
+            return game
+        return self.position(target)
+
+
+def changed_piles(old: Game, new: Game) -> list[str]:
+    """Ids of the pile widgets showing piles that differ between two games"""
+    changed = []
+    if old.stock != new.stock:
+        changed.append("stock")
+    if old.waste != new.waste:
+        changed.append("waste")
+    for i, (old_pile, new_pile) in enumerate(zip(old.foundations, new.foundations)):
+        if len(old_pile) != len(new_pile):
+            changed.append(f"foundation{i}")
+    for i, (old_pile, new_pile) in enumerate(zip(old.tableau, new.tableau)):
+        if old_pile != new_pile or old.face_down_counts[i] != new.face_down_counts[i]:
+            changed.append(f"tableau{i}")
+    return changed
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Variants of the Klondike rules.
+
+A Game looks up what it needs from its rules once, when it's created, so
+the moves don't have to check which variant is being played.
+"""
+
+from dataclasses import dataclass
+
+from .card import Card
+
+
+def _deal_one(stock: list[Card], waste: list[Card]):
+    waste.append(stock.pop())
+
+
+def _deal_three(stock: list[Card], waste: list[Card]):
+    cards = stock[-3:]
+    del stock[-3:]
+    cards.reverse()
+    waste.extend(cards)
+
+
+_DEAL_FUNCTIONS = {1: _deal_one, 3: _deal_three}
+
+MAX_REDEALS = 254
+VEGAS_BUY_IN = 52
+VEGAS_POINTS_PER_CARD = 5
+
+
+@dataclass(frozen=True)
+class Rules:
+    # cards dealt from the stock at a time
+    draw_count: int = 1
+    # times the stock can be restored from the waste, None for no limit
+    max_redeals: int | None = None
+    # score $5 per card sent to the foundations, after paying $52 for the deck
+    vegas_scoring: bool = False
+
+    def __post_init__(self):
+        if self.draw_count not in _DEAL_FUNCTIONS:
+            raise ValueError("Unsupported draw count: %r" % self.draw_count)
+        # the redeals left are stored in a byte of the position keys
+        if self.max_redeals is not None and not 0 <= self.max_redeals <= MAX_REDEALS:
+            raise ValueError("Unsupported number of redeals: %r" % self.max_redeals)
+
+    @property
+    def deal_function(self):
+        """Function moving cards from the stock to the waste"""
+        return _DEAL_FUNCTIONS[self.draw_count]
+
+    @property
+    def initial_redeals(self) -> int:
+        return 1 if self.max_redeals is None else self.max_redeals
+
+    @property
+    def redeal_cost(self) -> int:
+        """How much restoring the stock takes from the redeals left"""
+        return 0 if self.max_redeals is None else 1
+
+
+KLONDIKE = Rules()
+DRAW_THREE = Rules(draw_count=3)
+VEGAS = Rules(draw_count=3, max_redeals=2, vegas_scoring=True)
+
+RULES = {
+    "klondike": KLONDIKE,
+    "draw-three": DRAW_THREE,
+    "vegas": VEGAS,
+}
@@ -0,0 +1,229 @@
+"""
+Server hosting many independent games in one process, for bots and other programs.
+
+Clients connect to a Unix socket or a localhost TCP port and send JSON
+objects, one per line, getting one JSON line back for each of them:
+
+    {"op": "new", "seed": 42}            -> {"ok": true, "session": 1}
+    {"op": "new", "rules": "vegas"}      -> {"ok": true, "session": 2}
+    {"op": "moves", "session": 1}        -> {"ok": true, "moves": ["deal", "reveal 3"]}
+    {"op": "move", "session": 1, "move": "deal"}
+                                         -> {"ok": true, "won": false}
+    {"op": "state", "session": 1}        -> {"ok": true, "state": {...}}
+    {"op": "close", "session": 1}        -> {"ok": true}
+
+Adding "moves": true to a "new" or "move" request also returns the legal
+moves of the resulting position, saving a round trip. Adding
+"dead_end": true to a "move" request also tells whether the game is a dead
+end, when no move can help winning it anymore, see Game.is_dead_end().
+Errors are reported as {"ok": false, "error": "..."}.
+
+Sessions that aren't used for a while are evicted, as are the least
+recently used ones when there are too many of them.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+from usolitaire.card import Card
+from usolitaire.exceptions import InvalidMove
+from usolitaire.game import ALL_MOVES, Game, Move
+from usolitaire.rules import RULES
+
+DEFAULT_PORT = 7654
+DEFAULT_IDLE_TIMEOUT = 600
+DEFAULT_MAX_SESSIONS = 100_000
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+# text forms of the moves, so that they aren't formatted and parsed again
+_MOVE_TEXTS = {move: str(move) for move in ALL_MOVES}
+_MOVES_BY_TEXT = {text: move for move, text in _MOVE_TEXTS.items()}
+
+
+def _legal_move_texts(game: Game) -> list[str]:
+    return [_MOVE_TEXTS[move] for move in game.legal_moves()]
+
+
+def card_code(card: Card) -> str:
+    """Short text form of a card, e.g. "10h" for the ten of hearts"""
+    return card.rank + card.suit[0]
+
+
+def game_state(game: Game) -> dict:
+    """Describe the position of a game, showing only what a player can see"""
+    return {
+        "stock": len(game.stock),
+        "waste": [card_code(card) for card in game.waste],
+        "foundations": [len(pile) for pile in game.foundations],
+        "tableau": [
+            {"face_down": face_down, "cards": [card_code(card) for card in pile[face_down:]]}
+            for pile, face_down in zip(game.tableau, game.face_down_counts)
+        ],
+        "redeals_left": game.redeals_left if game.rules.max_redeals is not None else None,
+        "score": game.score(),
+        "won": game.won(),
+        "dead_end": game.is_dead_end(),
+    }
+
+
+class _Session(object):
+    __slots__ = ("game", "last_used")
+
+    def __init__(self, game: Game, last_used: float):
+        self.game = game
+        self.last_used = last_used
+
+
+class ProtocolError(Exception):
+    """Raised when a request can't be handled"""
+
+
+class GameServer(object):
+    """
+    Keeps the game sessions and answers the requests of the protocol.
+
+    Requests are handled synchronously by handle_request(), the asyncio part
+    only moves lines between the sockets and this object.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+    ):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        # ordered from the least to the most recently used
+        self.sessions: OrderedDict[int, _Session] = OrderedDict()
+        self._next_session_id = 1
+        self._handlers = {
+            "new": self._new,
+            "move": self._move,
+            "moves": self._moves,
+            "state": self._state,
+            "close": self._close,
+        }
+
+    def handle_request(self, line: bytes) -> bytes:
+        """Handle one request line, returning the response line"""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ProtocolError("Request must be a JSON object")
+            op = request.get("op")
+            handler = self._handlers.get(op) if isinstance(op, str) else None
+            if handler is None:
+                raise ProtocolError("Unknown op: %r" % (op,))
+            response = handler(request)
+        except (ProtocolError, InvalidMove, ValueError, RecursionError) as e:
+            response = {"ok": False, "error": str(e) or e.__class__.__name__}
+        return _encode(response).encode() + b"\n"
+
+    def _get_session(self, request: dict) -> _Session:
+        session_id = request.get("session")
+        session = self.sessions.get(session_id) if type(session_id) is int else None
+        if session is None:
+            raise ProtocolError("Unknown session: %r" % session_id)
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def _new(self, request: dict) -> dict:
+        seed = request.get("seed")
+        if seed is not None and not isinstance(seed, int):
+            raise ProtocolError("Seed must be an integer")
+        rules_name = request.get("rules", "klondike")
+        rules = RULES.get(rules_name) if isinstance(rules_name, str) else None
+        if rules is None:
+            raise ProtocolError("Unknown rules: %r" % (rules_name,))
+        while len(self.sessions) >= self.max_sessions:
+            self.sessions.popitem(last=False)
+        session_id = self._next_session_id
+        self._next_session_id += 1
+        game = Game(seed=seed, rules=rules)
+        self.sessions[session_id] = _Session(game, time.monotonic())
+        response = {"ok": True, "session": session_id}
+        if request.get("moves"):
+            response["moves"] = _legal_move_texts(game)
+        return response
+
+    def _move(self, request: dict) -> dict:
+        game = self._get_session(request).game
+        move = request.get("move")
+        if not isinstance(move, str):
+            raise ProtocolError("Move must be a string")
+        game.apply_move(_MOVES_BY_TEXT.get(move) or Move.parse(move))
+        response = {"ok": True, "won": game.won()}
+        if request.get("dead_end"):
+            response["dead_end"] = game.is_dead_end()
+        if request.get("moves"):
+            response["moves"] = _legal_move_texts(game)
+        return response
+
+    def _moves(self, request: dict) -> dict:
+        game = self._get_session(request).game
+        return {"ok": True, "moves": _legal_move_texts(game)}
+
+    def _state(self, request: dict) -> dict:
+        return {"ok": True, "state": game_state(self._get_session(request).game)}
+
+    def _close(self, request: dict) -> dict:
+        self._get_session(request)
+        del self.sessions[request["session"]]
+        return {"ok": True}
+
+    def evict_idle_sessions(self, now: float | None = None) -> int:
+        """Remove the sessions that weren't used within the idle timeout"""
+        deadline = (time.monotonic() if now is None else now) - self.idle_timeout
+        evicted = 0
+        while self.sessions:
+            oldest = next(iter(self.sessions.values()))
+            if oldest.last_used > deadline:
+                break
+            self.sessions.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                writer.write(self.handle_request(line))
+                await writer.drain()
+        except ValueError:
+            # the line is over the stream limit, the rest of it can't be told
+            # apart from the next requests
+            writer.write(_encode({"ok": False, "error": "Request too long"}).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def evict_idle_sessions_periodically(self):
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, 60))
+            self.evict_idle_sessions()
+
+
+async def serve(
+    path: str | None = None,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_PORT,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    max_sessions: int = DEFAULT_MAX_SESSIONS,
+):
+    """Run the server on the given Unix socket path, or on the given TCP port"""
+    game_server = GameServer(idle_timeout=idle_timeout, max_sessions=max_sessions)
+    if path:
+        server = await asyncio.start_unix_server(game_server.handle_client, path=path)
+    else:
+        server = await asyncio.start_server(game_server.handle_client, host, port)
+    eviction = asyncio.create_task(game_server.evict_idle_sessions_periodically())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        eviction.cancel()
@@ -0,0 +1,141 @@
+"""
+Depth-first solver for Klondike games, with full knowledge of the cards.
+"""
+
+from dataclasses import dataclass, field
+
+from usolitaire.game import Game, Move, MoveType
+from usolitaire.position_cache import PositionCache, hash_position_key
+
+DEFAULT_MAX_NODES = 200_000
+
+_MOVE_PRIORITY = {
+    MoveType.REVEAL: 0,
+    MoveType.TABLEAU_TO_FOUNDATION: 0,
+    MoveType.WASTE_TO_FOUNDATION: 0,
+    MoveType.TABLEAU_TO_TABLEAU: 2,
+    MoveType.WASTE_TO_TABLEAU: 2,
+    MoveType.DEAL: 3,
+    MoveType.RESTORE: 3,
+}
+
+
+@dataclass
+class SolveResult:
+    # None when the search gave up before knowing
+    winnable: bool | None
+    # number of positions searched
+    nodes: int
+    # moves found by the search, which may stop at a position the cache
+    # already knew to be winnable
+    solution: list[Move] | None = None
+    # total number of moves needed to win
+    solution_length: int | None = None
+    # (position hash, winnable, distance) of the positions proven by this
+    # search, to be stored in a PositionCache
+    proven: list[tuple[int, bool, int]] = field(default_factory=list)
+
+
+def ordered_moves(game: Game) -> list[Move]:
+    """
+    List the legal moves worth trying, the most promising first.
+
+    Revealing a card is never a bad idea, so when possible it's the only
+    move given. Moving a whole pile of face-up cards to an empty pile only
+    swaps two piles, so it's left out.
+    """
+    moves = []
+    for move in game.legal_moves():
+        move_type = move.type
+        if move_type is MoveType.REVEAL:
+            return [move]
+        priority = _MOVE_PRIORITY[move_type]
+        if move_type is MoveType.TABLEAU_TO_TABLEAU:
+            face_down_count = game.face_down_counts[move.source]
+            if game._find_movable_index(move.source, move.target) == face_down_count:
+                if not face_down_count and not game.tableau[move.target]:
+                    continue
+                if face_down_count:
+                    priority = 1  # uncovers a card facing down
+        moves.append((priority, move))
+    moves.sort(key=lambda item: item[0])
+    return [move for _, move in moves]
+
+
+def solve(
+    game: Game,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    cache: PositionCache | None = None,
+    canonical: bool = False,
+) -> SolveResult:
+    """
+    Search for a way to win the given game, without changing it.
+
+    Positions known by the cache are not searched again. The positions
+    this search proves winnable or unwinnable are returned in the result,
+    it's up to the caller to store them in a writable cache.
+
+    With canonical=True, positions are identified by Game.canonical_key(),
+    so positions only differing by the order of the tableau piles or by
+    swapping suits of the same color are only searched once. Computing
+    these keys is slower, and such positions rarely come up from a deal.
+    """
+    position_key = Game.canonical_key if canonical else Game.position_key
+    root = game.copy()
+    root_key = position_key(root)
+    if root.won():
+        return SolveResult(True, 0, [], 0, [(hash_position_key(root_key), True, 0)])
+
+    seen = {root_key}
+    # each entry is a position on the current path, its hash and the moves
+    # left to try from it
+    stack = [(root, hash_position_key(root_key), iter(ordered_moves(root)))]
+    path: list[Move] = []
+    nodes = 0
+    while stack:
+        position, _, moves = stack[-1]
+        move = next(moves, None)
+        if move is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+
+        child = position.copy()
+        child.apply_move(move)
+        key = position_key(child)
+        if key in seen:
+            continue
+        seen.add(key)
+        nodes += 1
+        child_hash = hash_position_key(key)
+
+        if child.won():
+            known = (True, 0)
+        elif cache is not None:
+            known = cache.lookup(child_hash)
+        else:
+            known = None
+        if known is not None:
+            winnable, distance = known
+            if not winnable:
+                continue
+            path.append(move)
+            length = len(path) + distance
+            proven = [(child_hash, True, distance)]
+            proven.extend(
+                (position_hash, True, length - depth)
+                for depth, (_, position_hash, _) in enumerate(stack)
+            )
+            return SolveResult(True, nodes, path, length, proven)
+
+        if child.is_dead_end():
+            continue
+        if nodes >= max_nodes:
+            return SolveResult(None, nodes)
+        stack.append((child, child_hash, iter(ordered_moves(child))))
+        path.append(move)
+
+    # every position reachable from the root was searched without finding
+    # a way to win, so none of them can be won
+    return SolveResult(False, nodes, proven=[(hash_position_key(k), False, 0) for k in seen])
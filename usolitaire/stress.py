@@ -0,0 +1,263 @@
+"""
+Randomized stress test of the game engine.
+
+Plays seeded games with a mix of legal and illegal moves, checking after
+each move that:
+
+- a move raises InvalidMove exactly when it isn't in Game.legal_moves(),
+  and in that case leaves the game unchanged
+- the cards a move takes from a pile are the ones it adds to another, so
+  the 52 cards are conserved
+- foundations hold the cards of their suit in order
+- cards facing down stay at the bottom of the piles, and cards are only
+  stacked on cards facing up, in alternating colors and descending order
+
+Only the piles touched by each move are checked, with a full check of the
+board at the end of each game. Failures are shrunk to a minimal sequence
+of moves reproducing them.
+
+Run with:
+
+    python -m usolitaire.stress --games 100 --moves 10000
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass
+
+from usolitaire.card import ALL_CARDS
+from usolitaire.deck import Deck
+from usolitaire.exceptions import InvalidMove
+from usolitaire.game import ALL_MOVES, Game, Move, MoveType
+from usolitaire.rules import KLONDIKE, RULES, Rules
+from usolitaire.utils import RANK_INDEX, rank_diff, suit_color
+
+
+# cards of each suit, in the order they go to the foundations
+_SUIT_CARDS = [[card for card in ALL_CARDS if card.suit == suit] for suit in Deck.suits]
+
+
+class InvariantError(Exception):
+    """Raised when the game breaks one of the checked invariants"""
+
+
+@dataclass
+class Failure:
+    seed: int
+    moves: list[Move]
+    message: str
+
+
+def _piles_touched(game: Game, move: Move) -> list[list]:
+    move_type = move.type
+    if move_type in (MoveType.DEAL, MoveType.RESTORE):
+        return [game.stock, game.waste]
+    if move_type is MoveType.WASTE_TO_TABLEAU:
+        return [game.waste, game.tableau[move.target]]
+    if move_type is MoveType.WASTE_TO_FOUNDATION:
+        return [game.waste, *game.foundations]
+    if move_type is MoveType.TABLEAU_TO_FOUNDATION:
+        return [game.tableau[move.source], *game.foundations]
+    if move_type is MoveType.TABLEAU_TO_TABLEAU:
+        return [game.tableau[move.source], game.tableau[move.target]]
+    return [game.tableau[move.source]]
+
+
+def _check_tableau_pile(game: Game, index: int, start: int = 0):
+    """Check the cards facing up of a tableau pile, from the given position"""
+    pile = game.tableau[index]
+    face_down_count = game.face_down_counts[index]
+    if not 0 <= face_down_count <= len(pile):
+        raise InvariantError("Pile %d has %d cards facing down" % (index, face_down_count))
+    for i in range(max(start, face_down_count) + 1, len(pile)):
+        below, above = pile[i - 1], pile[i]
+        if rank_diff(above.rank, below.rank) != 1 or suit_color(above.suit) == suit_color(
+            below.suit
+        ):
+            raise InvariantError("Pile %d has %r on top of %r" % (index, above, below))
+
+
+def _check_foundation_top(game: Game, index: int):
+    pile = game.foundations[index]
+    if pile and (pile[-1].suit != Deck.suits[index] or RANK_INDEX[pile[-1].rank] != len(pile) - 1):
+        raise InvariantError("Foundation %d has %r on top" % (index, pile[-1]))
+
+
+def check_board(game: Game):
+    """Check all the invariants on the whole board"""
+    cards = [*game.stock, *game.waste]
+    if set(cards) != game.stock_cycle_cards:
+        raise InvariantError("Stock cycle cards don't match the stock and waste")
+    for pile in game.tableau + game.foundations:
+        cards.extend(pile)
+    if len(cards) != len(ALL_CARDS) or set(cards) != set(ALL_CARDS):
+        raise InvariantError("The game doesn't have the 52 cards anymore")
+    for i in range(7):
+        _check_tableau_pile(game, i)
+    for i, pile in enumerate(game.foundations):
+        if pile != _SUIT_CARDS[i][: len(pile)]:
+            raise InvariantError("Foundation %d is out of order" % i)
+
+
+def check_move(game: Game, move: Move, legal: bool):
+    """
+    Apply a move to the game, checking that it fails exactly when it's not
+    legal, and the invariants of the piles it touches.
+    """
+    piles = _piles_touched(game, move)
+    before = [pile[:] for pile in piles]
+    key = None if legal else game.position_key()
+    stock_cycle_size = len(game.stock_cycle_cards)
+    face_down_count = game.face_down_counts[move.source] if move.source is not None else 0
+    try:
+        game.apply_move(move)
+    except InvalidMove:
+        if legal:
+            raise InvariantError("Legal move %s raised InvalidMove" % move)
+        if game.position_key() != key:
+            raise InvariantError("Illegal move %s changed the game" % move)
+        return
+    if not legal:
+        raise InvariantError("Illegal move %s didn't raise InvalidMove" % move)
+
+    lengths = [len(pile) for pile in piles]
+    if sum(lengths) != sum(map(len, before)):
+        raise InvariantError("Move %s lost or added cards" % move)
+    move_type = move.type
+    if move_type in (MoveType.DEAL, MoveType.RESTORE):
+        if sorted(game.stock + game.waste, key=id) != sorted(before[0] + before[1], key=id):
+            raise InvariantError("Move %s changed the cards of the stock" % move)
+        if len(game.stock_cycle_cards) != stock_cycle_size:
+            raise InvariantError("Move %s changed the stock cycle cards" % move)
+        return
+    if move_type is MoveType.REVEAL:
+        if piles[0] != before[0] or game.face_down_counts[move.source] != face_down_count - 1:
+            raise InvariantError("Move %s didn't turn only the top card" % move)
+        return
+
+    source, source_before = piles[0], before[0]
+    moved = source_before[len(source) :]
+    if source != source_before[: len(source)] or not moved:
+        raise InvariantError("Move %s changed the source pile wrongly" % move)
+    if move_type in (MoveType.WASTE_TO_TABLEAU, MoveType.WASTE_TO_FOUNDATION):
+        cycle = game.stock_cycle_cards
+        if moved[0] in cycle or len(cycle) != stock_cycle_size - 1:
+            raise InvariantError("Move %s didn't update the stock cycle cards" % move)
+    if move_type in (MoveType.WASTE_TO_FOUNDATION, MoveType.TABLEAU_TO_FOUNDATION):
+        index = Deck.suits.index(moved[0].suit)
+        if game.foundations[index][-1:] != moved:
+            raise InvariantError("Move %s didn't put %r on its foundation" % (move, moved))
+        _check_foundation_top(game, index)
+    else:
+        target_index = move.target
+        target = game.tableau[target_index]
+        if target[-len(moved) :] != moved:
+            raise InvariantError("Move %s didn't move %r" % (move, moved))
+        _check_tableau_pile(game, target_index, len(target) - len(moved) - 1)
+    if move.source is not None:
+        _check_tableau_pile(game, move.source, len(source) - 1)
+
+
+def _failure_message(error: Exception) -> str:
+    if isinstance(error, (InvariantError, AssertionError)):
+        return str(error) or error.__class__.__name__
+    # the engine crashed
+    return "%s: %s" % (error.__class__.__name__, error)
+
+
+def play(
+    seed: int,
+    moves: int,
+    rules: Rules = KLONDIKE,
+    legal_ratio: float = 0.7,
+) -> tuple[list[Move], Failure | None]:
+    """Play random moves on the game of the given seed, returning the moves and any failure"""
+    rng = random.Random(seed)
+    game = Game(seed=seed, rules=rules)
+    played = []
+    try:
+        for _ in range(moves):
+            legal_moves = game.legal_moves()
+            if legal_moves and rng.random() < legal_ratio:
+                move = rng.choice(legal_moves)
+            else:
+                move = rng.choice(ALL_MOVES)
+            played.append(move)
+            check_move(game, move, move in legal_moves)
+        check_board(game)
+    except Exception as e:
+        return played, Failure(seed, played, _failure_message(e))
+    return played, None
+
+
+def replay(seed: int, moves: list[Move], rules: Rules = KLONDIKE) -> str | None:
+    """Replay moves on the game of the given seed, returning the failure message if any"""
+    game = Game(seed=seed, rules=rules)
+    try:
+        for move in moves:
+            check_move(game, move, move in game.legal_moves())
+        check_board(game)
+    except Exception as e:
+        return _failure_message(e)
+    return None
+
+
+def shrink(failure: Failure, rules: Rules = KLONDIKE, fails=replay) -> Failure:
+    """
+    Find a smaller sequence of moves reproducing a failure, by removing
+    chunks of moves for as long as the failure still happens.
+    """
+    moves = failure.moves
+    message = fails(failure.seed, moves, rules)
+    if message is None:
+        return failure
+    chunk = len(moves) // 2
+    while chunk >= 1:
+        start = 0
+        while start < len(moves):
+            candidate = moves[:start] + moves[start + chunk :]
+            candidate_message = fails(failure.seed, candidate, rules)
+            if candidate_message is not None:
+                moves, message = candidate, candidate_message
+            else:
+                start += chunk
+        chunk //= 2
+    return Failure(failure.seed, moves, message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress test the game engine")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--moves", type=int, default=10_000, help="moves per game")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--rules", choices=list(RULES), default="klondike")
+    parser.add_argument(
+        "--legal-ratio",
+        type=float,
+        default=0.7,
+        help="how often to pick a legal move rather than any move (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    rules = RULES[args.rules]
+
+    total_moves = 0
+    failures = []
+    start = time.perf_counter()
+    for seed in range(args.first_seed, args.first_seed + args.games):
+        played, failure = play(seed, args.moves, rules, args.legal_ratio)
+        total_moves += len(played)
+        if failure is not None:
+            failures.append(failure)
+    elapsed = time.perf_counter() - start
+    print(f"{total_moves} moves in {elapsed:.1f}s: {total_moves / elapsed:.0f} moves/s")
+
+    for failure in failures:
+        failure = shrink(failure, rules)
+        print(f"\nFAILED seed={failure.seed}: {failure.message}")
+        print("Moves:", ", ".join(str(move) for move in failure.moves))
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
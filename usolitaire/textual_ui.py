@@ -95,10 +95,20 @@ class PileWidget(Static):
 
     can_focus = True
 
-    def __init__(self, pile: list[Card], **kwargs) -> None:
+    def __init__(
+        self,
+        pile: list[Card],
+        face_up: bool = True,
+        card_size: card_render.CardSize = card_render.DEFAULT_CARD_SIZE,
+        styled: bool = True,
+        **kwargs,
+    ) -> None:
         super().__init__(**kwargs)
         self.pile = pile
-        self.update(card_render.draw_empty_card())
+        self.face_up = face_up
+        self.card_size = card_size
+        self.styled = styled
+        self.update(card_render.render_empty_card(card_size))
         self.refresh_contents()
         self.last_time_clicked = None
 
@@ -107,9 +117,13 @@ class PileWidget(Static):
 
     def watch_top_card(self, card: Card | None) -> None:
         if card:
-            self.update(card_render.draw_card(card, add_rich_markup=True))
+            self.update(
+                card_render.render_card(
+                    card, face_up=self.face_up, size=self.card_size, styled=self.styled
+                )
+            )
         else:
-            self.update(card_render.draw_empty_card())
+            self.update(card_render.render_empty_card(self.card_size))
 
     def _post_click_message(self, click_type: ClickType) -> None:
         self.post_message(CardClicked(self.id, self.top_card, click_type))
@@ -135,18 +149,62 @@ class PileWidget(Static):
             self.post_message(MoveFocus(self.id, MoveDirection.DOWN))
 
 
+class WastePileWidget(PileWidget):
+    """
+    Pile widget fanning out the cards on top of the pile, for the rules
+    where cards are dealt three at a time.
+    """
+
+    top_cards = reactive(())
+
+    def __init__(self, pile: list[Card], fan_size: int = 3, **kwargs) -> None:
+        self.fan_size = fan_size
+        super().__init__(pile, **kwargs)
+
+    def refresh_contents(self):
+        super().refresh_contents()
+        self.top_cards = tuple(self.pile[-self.fan_size :])
+
+    def watch_top_card(self, card: Card | None) -> None:
+        # drawn by watch_top_cards
+        pass
+
+    def watch_top_cards(self, cards: tuple[Card, ...]) -> None:
+        if cards:
+            self.update(card_render.render_fan(cards, size=self.card_size, styled=self.styled))
+        else:
+            self.update(card_render.render_empty_card(self.card_size))
+
+
 class TableauCardWidget(Static):
     can_focus = True
 
-    def __init__(self, card: Card, is_covered=False, **kwargs) -> None:
+    def __init__(
+        self,
+        card: Card,
+        face_up=True,
+        is_covered=False,
+        card_size: card_render.CardSize = card_render.DEFAULT_CARD_SIZE,
+        styled: bool = True,
+        **kwargs,
+    ) -> None:
         super().__init__(**kwargs)
         self.card = card
+        self.face_up = face_up
         self.is_covered = is_covered
+        self.card_size = card_size
+        self.styled = styled
         self.last_time_clicked = None
 
     def compose(self) -> ComposeResult:
         yield Static(
-            card_render.draw_card(self.card, only_top=self.is_covered, add_rich_markup=True)
+            card_render.render_card(
+                self.card,
+                face_up=self.face_up,
+                only_top=self.is_covered,
+                size=self.card_size,
+                styled=self.styled,
+            )
         )
 
     def _post_click_message(self, click_type: ClickType) -> None:
@@ -179,25 +237,55 @@ class TableauCardWidget(Static):
 class TableauPileWidget(Static):
     can_focus = True
 
-    def __init__(self, pile: list[Card], index: int, **kwargs) -> None:
+    def __init__(
+        self,
+        pile: list[Card],
+        index: int,
+        face_down_count: int = 0,
+        card_size: card_render.CardSize = card_render.DEFAULT_CARD_SIZE,
+        styled: bool = True,
+        **kwargs,
+    ) -> None:
         super().__init__(**kwargs)
         self.pile = pile
         self.index = index
+        self.face_down_count = face_down_count
+        self.card_size = card_size
+        self.styled = styled
 
     def compose(self) -> ComposeResult:
         if not self.pile:
-            yield Static(card_render.draw_empty_card())
+            yield Static(card_render.render_empty_card(self.card_size))
             return
         for i, card in enumerate(self.pile):
-            if i == len(self.pile) - 1:
-                yield TableauCardWidget(card, is_covered=False)
-            else:
-                yield TableauCardWidget(card, is_covered=True)
+            yield TableauCardWidget(
+                card,
+                face_up=i >= self.face_down_count,
+                is_covered=i < len(self.pile) - 1,
+                card_size=self.card_size,
+                styled=self.styled,
+            )
 
     def refresh_contents(self):
-        self.remove_children()
-        for w in self.compose():
-            self.mount(w)
+        """
+        Update the card widgets to the pile, keeping the ones at the bottom
+        that didn't change, so that only the changed cards are repainted.
+        """
+        widgets = list(self.compose())
+        unchanged = 0
+        for child, widget in zip(self.children, widgets):
+            if not (
+                isinstance(child, TableauCardWidget)
+                and isinstance(widget, TableauCardWidget)
+                and child.card is widget.card
+                and child.face_up == widget.face_up
+                and child.is_covered == widget.is_covered
+            ):
+                break
+            unchanged += 1
+        self.remove_children(self.children[unchanged:])
+        if widgets[unchanged:]:
+            self.mount(*widgets[unchanged:])
 
     def on_card_clicked(self, event: CardClicked):
         if event.card is None:
@@ -0,0 +1,214 @@
+"""
+Tournament between play policies, over the same seeded deals.
+
+Each policy plays every deal, in a pool of processes. The report shows,
+with 95% confidence intervals, how often each policy won, how many moves
+it played and how long it took to pick a move:
+
+    python -m usolitaire.tournament greedy search --count 500
+
+Games are reproducible: the deal and the random choices of the policies
+only depend on the seed.
+"""
+
+import argparse
+import itertools
+import math
+import multiprocessing
+import random
+import statistics
+import time
+from dataclasses import dataclass
+
+from usolitaire.game import Game
+from usolitaire.policies import POLICIES, load_policy
+from usolitaire.rules import KLONDIKE, RULES, Rules
+
+DEFAULT_MAX_MOVES = 1000
+
+# z-score of the 95% confidence intervals
+_Z = 1.96
+
+
+@dataclass(frozen=True)
+class GameResult:
+    policy: str
+    seed: int
+    won: bool
+    moves: int
+    decisions: int
+    # seconds spent by the policy picking its moves
+    decision_time: float
+
+
+@dataclass(frozen=True)
+class Estimate:
+    mean: float
+    low: float
+    high: float
+
+    def __str__(self):
+        return f"{self.mean:.4g} [{self.low:.4g}, {self.high:.4g}]"
+
+
+@dataclass(frozen=True)
+class PolicyStats:
+    policy: str
+    games: int
+    wins: int
+    win_rate: Estimate
+    moves: Estimate
+    # seconds per decision
+    decision_time: Estimate
+
+
+def play_game(
+    policy_name: str, seed: int, rules: Rules = KLONDIKE, max_moves: int = DEFAULT_MAX_MOVES
+) -> GameResult:
+    """Play the deal of the given seed with a new policy, until it's won or the policy gives up"""
+    policy = load_policy(policy_name)()
+    game = Game(seed=seed, rules=rules)
+    rng = random.Random(seed)
+    moves = decisions = 0
+    decision_time = 0.0
+    while moves < max_moves and not game.won() and not game.is_dead_end():
+        legal_moves = game.legal_moves()
+        start = time.perf_counter()
+        move = policy.choose_move(game, legal_moves, rng)
+        decision_time += time.perf_counter() - start
+        decisions += 1
+        if move is None:
+            break
+        game.apply_move(move)
+        moves += 1
+    return GameResult(policy_name, seed, game.won(), moves, decisions, decision_time)
+
+
+def _play_game(args) -> GameResult:
+    return play_game(*args)
+
+
+def run_tournament(
+    policies: list[str],
+    first_seed: int = 0,
+    count: int = 100,
+    rules: Rules = KLONDIKE,
+    max_moves: int = DEFAULT_MAX_MOVES,
+    processes: int | None = None,
+) -> list[GameResult]:
+    """
+    Play count deals starting at first_seed with each policy, using a pool
+    of processes. The results are sorted by policy and seed.
+    """
+    for name in policies:
+        load_policy(name)  # fail early on unknown policies
+    tasks = [
+        (name, seed, rules, max_moves)
+        for name in policies
+        for seed in range(first_seed, first_seed + count)
+    ]
+    if processes == 1:
+        results = list(map(_play_game, tasks))
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_play_game, tasks, chunksize=max(1, len(tasks) // 64))
+    return results
+
+
+def _wilson_interval(successes: int, trials: int) -> Estimate:
+    rate = successes / trials
+    denominator = 1 + _Z**2 / trials
+    center = (rate + _Z**2 / (2 * trials)) / denominator
+    margin = _Z * math.sqrt(rate * (1 - rate) / trials + _Z**2 / (4 * trials**2)) / denominator
+    return Estimate(rate, max(0.0, center - margin), min(1.0, center + margin))
+
+
+def _mean_interval(values: list[float]) -> Estimate:
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return Estimate(mean, mean, mean)
+    margin = _Z * statistics.stdev(values) / math.sqrt(len(values))
+    return Estimate(mean, mean - margin, mean + margin)
+
+
+def summarize(results: list[GameResult]) -> list[PolicyStats]:
+    """Statistics of each policy, in the order they first appear in the results"""
+    by_policy: dict[str, list[GameResult]] = {}
+    for result in results:
+        by_policy.setdefault(result.policy, []).append(result)
+    stats = []
+    for policy, games in by_policy.items():
+        wins = sum(game.won for game in games)
+        stats.append(
+            PolicyStats(
+                policy,
+                len(games),
+                wins,
+                _wilson_interval(wins, len(games)),
+                _mean_interval([game.moves for game in games]),
+                _mean_interval(
+                    [game.decision_time / game.decisions for game in games if game.decisions]
+                ),
+            )
+        )
+    return stats
+
+
+def _scaled(estimate: Estimate, factor: float) -> Estimate:
+    return Estimate(estimate.mean * factor, estimate.low * factor, estimate.high * factor)
+
+
+def report(results: list[GameResult]) -> str:
+    lines = []
+    for stats in summarize(results):
+        lines.append(
+            f"{stats.policy}: {stats.wins}/{stats.games} won, win rate {stats.win_rate}, "
+            f"moves {stats.moves}, ms/decision {_scaled(stats.decision_time, 1000)}"
+        )
+    won = {}
+    for result in results:
+        won.setdefault(result.policy, set())
+        if result.won:
+            won[result.policy].add(result.seed)
+    for first, second in itertools.combinations(won, 2):
+        lines.append(
+            f"{first} vs {second}: {len(won[first] - won[second])} deals only won by {first}, "
+            f"{len(won[second] - won[first])} only by {second}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare play policies over seeded deals")
+    parser.add_argument(
+        "policies",
+        nargs="+",
+        help="policies to compare: %s, or package.module:PolicyClass" % ", ".join(POLICIES),
+    )
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--count", type=int, default=100, help="number of deals")
+    parser.add_argument("--rules", choices=list(RULES), default="klondike")
+    parser.add_argument(
+        "--max-moves",
+        type=int,
+        default=DEFAULT_MAX_MOVES,
+        help="moves played before giving up on a deal (default: %(default)s)",
+    )
+    parser.add_argument("--processes", type=int, help="worker processes (default: all CPUs)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_tournament(
+        args.policies,
+        args.first_seed,
+        args.count,
+        RULES[args.rules],
+        args.max_moves,
+        args.processes,
+    )
+    print(report(results))
+    print(f"{len(results)} games in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ from typing import Literal
 from .card import Rank, Suit
 from .deck import Deck
 
+RANK_INDEX: dict[Rank, int] = {rank: index for index, rank in enumerate(Deck.ranks)}
+SUIT_INDEX: dict[Suit, int] = {suit: index for index, suit in enumerate(Deck.suits)}
+
 
 def suit_color(suit: Suit) -> Literal["red", "black"]:
     return "red" if suit in ("diamonds", "hearts") else "black"
@@ -12,5 +15,4 @@ def suit_color(suit: Suit) -> Literal["red", "black"]:
 
 def rank_diff(first: Rank, second: Rank) -> int:
     """Return the relative difference between the given ranks"""
-    assert first in Deck.ranks and second in Deck.ranks
-    return Deck.ranks.index(second) - Deck.ranks.index(first)
+    return RANK_INDEX[second] - RANK_INDEX[first]